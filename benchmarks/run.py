@@ -0,0 +1,274 @@
+"""
+Benchmarks for django-jschemer hot paths.
+
+Generates synthetic forms and payloads of increasing size and reports
+operations per second and latency percentiles for:
+
+    * DjangoFormToJSONSchema.convert_to_schema
+    * JSONSchemaFieldRegistry.get_schemafield
+    * SchemaValidator
+    * JSONSchemaField.widget_attrs (rendered) and data attribute encoding
+
+Usage::
+
+    python -m benchmarks.run                       # run everything
+    python -m benchmarks.run --quick -k validate   # subset, short runs
+    python -m benchmarks.run --save baseline.json  # store a baseline
+    python -m benchmarks.run --compare baseline.json --threshold 0.2
+
+With --compare the exit status is 1 if any benchmark is slower than the
+baseline by more than --threshold (a fraction of the baseline median).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.test_settings')
+
+import django  # noqa: E402
+django.setup()
+
+from django import forms  # noqa: E402
+
+from django_jschemer.forms import JSONSchemaField, SchemaValidator  # noqa: E402
+from django_jschemer.jsonschema import DjangoFormToJSONSchema  # noqa: E402
+from django_jschemer.registry import field_registry  # noqa: E402
+
+FIELD_SIZES = (10, 100, 1000, 5000)
+CHOICE_SIZES = (10, 1000, 10000)
+DEPTHS = (10, 25, 50)
+
+
+def make_form(n_fields, n_choices=5):
+    """
+    Build a Form class with n_fields fields of mixed types.
+    """
+    choices = [(str(i), 'Choice %d' % i) for i in range(n_choices)]
+    factories = (
+        lambda: forms.CharField(max_length=50, help_text='Some help'),
+        lambda: forms.IntegerField(min_value=1, max_value=100),
+        lambda: forms.EmailField(required=False),
+        lambda: forms.DateField(),
+        lambda: forms.BooleanField(required=False),
+        lambda: forms.ChoiceField(choices=choices),
+    )
+    attrs = dict(('field_%d' % i, factories[i % len(factories)]())
+                 for i in range(n_fields))
+    return type('Form%d' % n_fields, (forms.Form,), attrs)
+
+
+def make_document(form):
+    """
+    Build a valid document for a form made by make_form().
+    """
+    values = {
+        forms.CharField: 'text',
+        forms.IntegerField: 10,
+        forms.EmailField: 'user@example.com',
+        forms.DateField: '2017-01-02',
+        forms.BooleanField: True,
+    }
+    document = {}
+    for name, field in form.base_fields.items():
+        if isinstance(field, forms.ChoiceField):
+            document[name] = field.choices[0][0]
+        else:
+            document[name] = values[type(field)]
+    return document
+
+
+def make_nested(depth):
+    """
+    Build a (schema, document) pair nested depth levels deep.
+    """
+    schema = {'type': 'string'}
+    document = 'leaf'
+    for i in range(depth):
+        schema = {'type': 'object', 'properties': {'child': schema},
+                  'required': ['child']}
+        document = {'child': document}
+    return schema, document
+
+
+def measure(func, min_time=1.0, max_runs=10000):
+    """
+    Call func repeatedly for at least min_time seconds and return timings.
+    """
+    func()  # warm up caches and imports
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < max_runs:
+        before = time.perf_counter()
+        func()
+        after = time.perf_counter()
+        latencies.append(after - before)
+        if after - start >= min_time and len(latencies) >= 5:
+            break
+    latencies.sort()
+
+    def percentile(fraction):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+    return {
+        'runs': len(latencies),
+        'ops_per_sec': len(latencies) / sum(latencies),
+        'p50': percentile(0.50),
+        'p95': percentile(0.95),
+        'p99': percentile(0.99),
+    }
+
+
+def fixture(func):
+    """
+    Return a function calling func once, on first use, and then returning
+    its result.
+    """
+    result = []
+
+    def get():
+        if not result:
+            result.append(func())
+        return result[0]
+    return get
+
+
+def render_widget_attrs(schema, options):
+    """
+    Build the widget attributes of a new field and force their lazy values,
+    as rendering does.
+    """
+    field = JSONSchemaField(schema=schema, options=options)
+    attrs = field.widget_attrs(JSONSchemaField.widget())
+    return [str(value) for value in attrs.values()]
+
+
+def benchmarks(quick=False):
+    """
+    Yield (name, setup) pairs. setup() builds the fixtures of the benchmark
+    (shared between the benchmarks of the same size, and only built for the
+    benchmarks that run) and returns the callable to time.
+    """
+    field_sizes = FIELD_SIZES[:3] if quick else FIELD_SIZES
+    for size in field_sizes:
+        form = fixture(lambda size=size: make_form(size))
+        converted = fixture(
+            lambda form=form: DjangoFormToJSONSchema().convert_to_schema(form()))
+
+        def setup_convert(form=form):
+            form = form()
+            return lambda: DjangoFormToJSONSchema().convert_to_schema(form)
+
+        def setup_convert_cached(form=form):
+            form = form()
+            return lambda: DjangoFormToJSONSchema(
+                use_cache=True).convert_to_schema(form)
+
+        def setup_registry(form=form):
+            fields = list(form().base_fields.values())
+            return lambda: [field_registry.get_schemafield(field)
+                            for field in fields]
+
+        def setup_validate(form=form, converted=converted):
+            validator = SchemaValidator(converted()[0])
+            payload = json.dumps(make_document(form()))
+            return lambda: validator(payload)
+
+        def setup_encode(converted=converted):
+            field = JSONSchemaField(*converted())
+            return field.encode_data_attributes
+
+        def setup_widget_attrs(converted=converted):
+            schema, options = converted()
+            # Encoded attributes are cached per schema and language, so this
+            # times rendering a new field of an already rendered schema.
+            return lambda: render_widget_attrs(schema, options)
+
+        yield 'convert/fields=%d' % size, setup_convert
+        yield 'convert_cached/fields=%d' % size, setup_convert_cached
+        yield 'registry/fields=%d' % size, setup_registry
+        yield 'validate/fields=%d' % size, setup_validate
+        yield 'encode/fields=%d' % size, setup_encode
+        yield 'widget_attrs/fields=%d' % size, setup_widget_attrs
+
+    for n_choices in CHOICE_SIZES[:2] if quick else CHOICE_SIZES:
+        def setup_convert_choices(n_choices=n_choices):
+            form = make_form(6, n_choices=n_choices)
+            return lambda: DjangoFormToJSONSchema().convert_to_schema(form)
+        yield 'convert/choices=%d' % n_choices, setup_convert_choices
+
+    for depth in DEPTHS[:2] if quick else DEPTHS:
+        def setup_validate_nested(depth=depth):
+            schema, document = make_nested(depth)
+            validator = SchemaValidator(schema)
+            payload = json.dumps(document)
+            return lambda: validator(payload)
+        yield 'validate_nested/depth=%d' % depth, setup_validate_nested
+
+
+def format_row(name, result, baseline=None):
+    row = '%-32s %8d %12.1f %10.3f %10.3f %10.3f' % (
+        name, result['runs'], result['ops_per_sec'],
+        result['p50'] * 1000, result['p95'] * 1000, result['p99'] * 1000)
+    if baseline:
+        change = result['p50'] / baseline['p50'] - 1
+        row += ' %+8.1f%%' % (change * 100)
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-k', dest='keyword', default='',
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--quick', action='store_true',
+                        help='smaller sizes and shorter runs')
+    parser.add_argument('--min-time', type=float, default=None,
+                        help='seconds to spend per benchmark (default 1)')
+    parser.add_argument('--save', metavar='PATH',
+                        help='write the results as a baseline JSON file')
+    parser.add_argument('--compare', metavar='PATH',
+                        help='compare against a baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed slowdown of the median vs the baseline')
+    args = parser.parse_args(argv)
+
+    min_time = args.min_time
+    if min_time is None:
+        min_time = 0.2 if args.quick else 1.0
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+
+    print('%-32s %8s %12s %10s %10s %10s%s' % (
+        'benchmark', 'runs', 'ops/sec', 'p50 ms', 'p95 ms', 'p99 ms',
+        '   vs base' if baseline else ''))
+    results = {}
+    regressions = []
+    for name, setup in benchmarks(quick=args.quick):
+        if args.keyword not in name:
+            continue
+        result = measure(setup(), min_time=min_time)
+        results[name] = result
+        print(format_row(name, result, baseline.get(name)))
+        sys.stdout.flush()
+        if name in baseline and (result['p50'] > baseline[name]['p50'] *
+                                 (1 + args.threshold)):
+            regressions.append(name)
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({'python': sys.version.split()[0],
+                       'django': django.get_version(),
+                       'results': results},
+                      baseline_file, indent=2, sort_keys=True)
+    if regressions:
+        print('\nSlower than baseline by more than %d%%: %s' % (
+            args.threshold * 100, ', '.join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,5 @@
+import django
+
+# Django 3.2+ finds the AppConfig in apps.py by itself
+if django.VERSION < (3, 2):
+    default_app_config = 'django_jschemer.apps.JSchemerConfig'
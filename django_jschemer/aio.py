@@ -0,0 +1,110 @@
+"""
+Validation for async (ASGI) views.
+
+Schema validation is CPU bound, so validate_async() runs it in an executor
+instead of the event loop, with at most JSCHEMER_ASYNC_CONCURRENCY
+validations in flight per event loop.
+"""
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.exceptions import ValidationError
+from django.utils.module_loading import import_string
+from django.utils.translation import ugettext_lazy as _
+
+from django_jschemer.conf import get_setting
+
+_semaphores = weakref.WeakKeyDictionary()
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_concurrency():
+    return get_setting('JSCHEMER_ASYNC_CONCURRENCY') or os.cpu_count() or 1
+
+
+def _get_semaphore(loop):
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(get_concurrency())
+    return semaphore
+
+
+def _get_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=get_concurrency())
+        return _process_pool
+
+
+def get_executor(executor=None):
+    """
+    Return the concurrent.futures.Executor to validate in, or None for the
+    event loop's default executor.
+
+    executor -- None to use the JSCHEMER_ASYNC_EXECUTOR setting, 'thread'
+    for the loop's default executor, 'process' for a process pool shared by
+    all async validations, the dotted path of an Executor or an Executor.
+    """
+    if executor is None:
+        executor = get_setting('JSCHEMER_ASYNC_EXECUTOR')
+    if executor is None or executor == 'thread':
+        return None
+    if executor == 'process':
+        return _get_process_pool()
+    if isinstance(executor, str):
+        return import_string(executor)
+    return executor
+
+
+def _validate_value(validator, value):
+    """
+    Run validator on value and return None or its errors as (message, code,
+    params) tuples, which unlike ValidationErrors can be pickled.
+    """
+    try:
+        validator(value)
+    except ValidationError as error:
+        return [(str(e.message), e.code, e.params) for e in error.error_list]
+    return None
+
+
+async def validate_async(validator, value, executor=None, timeout=None):
+    """
+    Validate value with validator (e.g. a SchemaValidator) in an executor and
+    return it, raising ValidationError if it is not valid.
+
+    executor -- see get_executor(). The validator must be picklable when
+    validating in processes.
+    timeout -- seconds to wait for the validation once it has started.
+    Exceeding it raises a ValidationError with code 'timeout'.
+
+    Cancelling the awaiting task before a slot is free means the validation
+    never runs. A timeout or cancellation does not stop a validation that has
+    already been handed to the executor: it runs to completion, keeping its
+    slot until it finishes, and its result is discarded.
+    """
+    loop = asyncio.get_event_loop()
+    semaphore = _get_semaphore(loop)
+    await semaphore.acquire()
+    try:
+        future = loop.run_in_executor(get_executor(executor),
+                                      _validate_value, validator, value)
+    except BaseException:
+        semaphore.release()
+        raise
+    future.add_done_callback(lambda future: semaphore.release())
+    try:
+        errors = await asyncio.wait_for(asyncio.shield(future), timeout)
+    except asyncio.TimeoutError:
+        raise ValidationError(_("Validation timed out."), code='timeout')
+    if errors:
+        raise ValidationError([ValidationError(message, code=code,
+                                               params=params)
+                               for message, code, params in errors])
+    return value
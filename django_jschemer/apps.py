@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JSchemerConfig(AppConfig):
+    name = 'django_jschemer'
+    verbose_name = 'django-jschemer'
+
+    def ready(self):
+        # Import the forms modules of installed apps so that
+        # @export_schema decorated forms are registered before they are
+        # looked up (get_form_schema(), the jschemer_export command).
+        autodiscover_modules('forms')
@@ -0,0 +1,140 @@
+"""
+Validation of many JSON documents against the same schema.
+"""
+import itertools
+import os
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.exceptions import ValidationError
+
+
+class BatchResult(namedtuple('BatchResult', ['index', 'value', 'errors'])):
+    """
+    Outcome of validating one document of a batch.
+
+    index -- position of the document in the input.
+    value -- the document as given.
+    errors -- list of error messages, empty if the document is valid.
+    """
+    __slots__ = ()
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+
+# Validator of the current worker process when validating with
+# executor='process'. Set once per worker by _init_worker().
+_worker_validator = None
+
+# ProcessPoolExecutor got initializer in Python 3.7. Before that the
+# validator is sent with every chunk instead.
+_HAS_POOL_INITIALIZER = sys.version_info >= (3, 7)
+
+
+def _init_worker(validator):
+    global _worker_validator
+    _worker_validator = validator
+    # compile (and cache) the schema once per worker process
+    if hasattr(validator, 'get_validator'):
+        validator.get_validator()
+
+
+def _validate_chunk(chunk, validator=None):
+    if validator is None:
+        validator = _worker_validator
+    results = []
+    for value in chunk:
+        try:
+            validator(value)
+        except ValidationError as error:
+            results.append(error.messages)
+        else:
+            results.append([])
+    return results
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_batch(validator, documents, executor=None, workers=None,
+                   chunksize=100, max_pending=None):
+    """
+    Validate an iterable of JSON documents and yield a BatchResult for each
+    one, in input order, as soon as it is available.
+
+    validator -- a callable raising ValidationError for invalid documents,
+    typically a SchemaValidator. It must be picklable for executor='process'.
+    documents -- any iterable. It is consumed lazily, chunksize documents at a
+    time, so it can be larger than memory.
+    executor -- None to validate in the calling thread, 'thread' or 'process'
+    to fan out to a pool of `workers` threads/processes created for this
+    batch, or an existing concurrent.futures.Executor.
+    max_pending -- maximum number of chunks in flight (default twice the
+    number of workers). Bounds memory when results are consumed slowly.
+
+    With executor='process' each worker process receives the validator once
+    (once per chunk before Python 3.7) and compiles its schema once.
+    SchemaValidators of the same schema share the compiled validator of their
+    process in any mode.
+    """
+    chunks = _chunked(documents, chunksize)
+    if executor is None:
+        index = 0
+        for chunk in chunks:
+            for value, errors in zip(chunk, _validate_chunk(chunk, validator)):
+                yield BatchResult(index, value, errors)
+                index += 1
+        return
+
+    if isinstance(executor, Executor):
+        pool, task_validator, own_pool = executor, validator, False
+    elif executor == 'process' and _HAS_POOL_INITIALIZER:
+        pool = ProcessPoolExecutor(max_workers=workers,
+                                   initializer=_init_worker,
+                                   initargs=(validator,))
+        task_validator, own_pool = None, True
+    elif executor == 'process':
+        pool = ProcessPoolExecutor(max_workers=workers)
+        task_validator, own_pool = validator, True
+    elif executor == 'thread':
+        pool = ThreadPoolExecutor(max_workers=workers)
+        task_validator, own_pool = validator, True
+    else:
+        raise ValueError("executor must be None, 'thread', 'process' or an "
+                         "Executor instance")
+    if max_pending is None:
+        max_pending = 2 * (workers or getattr(pool, '_max_workers', None) or
+                           os.cpu_count() or 1)
+
+    pending = deque()
+    index = 0
+    try:
+        for chunk in chunks:
+            pending.append(
+                (chunk, pool.submit(_validate_chunk, chunk, task_validator)))
+            while len(pending) >= max_pending:
+                chunk, future = pending.popleft()
+                for value, errors in zip(chunk, future.result()):
+                    yield BatchResult(index, value, errors)
+                    index += 1
+        while pending:
+            chunk, future = pending.popleft()
+            for value, errors in zip(chunk, future.result()):
+                yield BatchResult(index, value, errors)
+                index += 1
+    finally:
+        # Only reached early if the consumer stopped iterating or a chunk
+        # failed.
+        for chunk, future in pending:
+            future.cancel()
+        if own_pool:
+            pool.shutdown(wait=True)
@@ -0,0 +1,166 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from django_jschemer.signals import cache_accessed
+
+
+def lazy_cache(factory):
+    """
+    Decorator turning a function that builds a cache into one that returns
+    the same, process wide, cache on every call. The cache is built on
+    first use, so settings are read lazily.
+    """
+    caches = []
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get_cache():
+        if not caches:
+            with lock:
+                if not caches:
+                    caches.append(factory())
+        return caches[0]
+    return get_cache
+
+
+class LRUCache(object):
+    """
+    A small, thread safe, least-recently-used mapping.
+
+    maxsize -- maximum number of entries to keep. None means unbounded.
+    name -- identifies the cache in cache_accessed signals.
+    """
+
+    def __init__(self, maxsize=128, name=None):
+        self.maxsize = maxsize
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        """
+        Return the value for key (marking it as recently used) or default.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                hit = False
+                value = default
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                hit = True
+        if cache_accessed.receivers:
+            cache_accessed.send(sender=self.__class__, cache=self.name, hit=hit)
+        return value
+
+    def set(self, key, value):
+        """
+        Store value under key, evicting the least recently used entries if
+        the cache grows past maxsize.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def keys(self):
+        """
+        Return a snapshot list of the keys, least recently used first.
+        """
+        with self._lock:
+            return list(self._data)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class ExpiringLRUCache(LRUCache):
+    """
+    An LRUCache whose entries expire and whose total size is bounded.
+
+    maxbytes -- maximum total size of the entries, as estimated by sizeof.
+    None means unbounded.
+    ttl -- seconds an entry stays valid. None means forever.
+    sizeof -- callable returning the (approximate) size of a value in bytes.
+    """
+
+    def __init__(self, maxsize=128, name=None, maxbytes=None, ttl=None,
+                 sizeof=None):
+        super(ExpiringLRUCache, self).__init__(maxsize=maxsize, name=name)
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.sizeof = sizeof or (lambda value: 0)
+        self.size = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= now:
+                del self._data[key]
+                self.size -= entry[2]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                hit = False
+                value = default
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                hit = True
+                value = entry[0]
+        if cache_accessed.receivers:
+            cache_accessed.send(sender=self.__class__, cache=self.name, hit=hit)
+        return value
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        if self.maxbytes is not None and size > self.maxbytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.size -= previous[2]
+            self._data[key] = (value, expires, size)
+            self.size += size
+            while ((self.maxsize is not None and len(self._data) > self.maxsize) or
+                   (self.maxbytes is not None and self.size > self.maxbytes)):
+                self.size -= self._data.popitem(last=False)[1][2]
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return default
+            self.size -= entry[2]
+            return entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.size = 0
@@ -0,0 +1,201 @@
+"""
+Choice sources serve the choices of large model relations over HTTP (see
+views.choices_view) so that they are not inlined in schemas.
+"""
+import inspect
+from functools import reduce
+import operator
+
+from django.db.models import Q
+
+try:
+    from django.urls import reverse
+except ImportError:  # Django < 1.10
+    from django.core.urlresolvers import reverse
+
+from django_jschemer.conf import get_setting
+
+
+def choice_rows(queryset, value_field='pk', label_field=None,
+                label_from_instance=str):
+    """
+    Return (value, label) tuples of a queryset, fetched with a single query.
+
+    label_field -- a field name or expression (e.g. Concat(...)) selected with
+    values_list(), so that no model instances are built. If None, instances
+    are fetched and labelled with label_from_instance.
+    """
+    if label_field is None:
+        return [(getattr(obj, value_field), label_from_instance(obj))
+                for obj in queryset]
+    if not isinstance(label_field, str):
+        queryset = queryset.annotate(_jschemer_label=label_field)
+        label_field = '_jschemer_label'
+    return list(queryset.values_list(value_field, label_field))
+
+
+def set_choice_label(form_cls, field_name, label_field):
+    """
+    Label the inlined choices of a ModelChoiceField of a Form class with
+    label_field (a field name or an expression) instead of str(obj), so that
+    no model instances are built. No choice source is needed.
+    """
+    # Form instances get copies of the field, with the attribute
+    form_cls.base_fields[field_name].jschemer_label_field = label_field
+
+
+def get_choice_label(field):
+    """
+    Return the label_field configured for a ModelChoiceField with
+    set_choice_label(), or else by its choice source, or None.
+    """
+    label_field = getattr(field, 'jschemer_label_field', None)
+    if label_field is None:
+        source = getattr(field, 'jschemer_choice_source', None)
+        if source is not None:
+            label_field = source.label_field
+    return label_field
+
+
+class ChoiceSource(object):
+    """
+    Paginated, searchable choices of a queryset.
+
+    queryset -- the choices. Only what it returns is ever served.
+    key -- identifies the source in URLs.
+    value_field -- field used as the choice value (the ModelChoiceField
+    to_field_name), defaults to the primary key.
+    label_field -- field name or expression used as the choice label instead
+    of str(obj). Inlined choices of fields of the model use it too.
+    search_fields -- fields searched (icontains) by the `q` parameter.
+    public -- serve the choices to every request, including anonymous ones.
+    permission -- callable taking the request and returning whether it may
+    read the choices. Without public or permission nothing is served.
+    """
+
+    def __init__(self, queryset, key, value_field=None, label_field=None,
+                 search_fields=(), public=False, permission=None):
+        self.queryset = queryset
+        self.key = key
+        self.value_field = value_field or 'pk'
+        self.label_field = label_field
+        self.search_fields = tuple(search_fields)
+        self.public = public
+        self.permission = permission
+        # The form field the source was registered for, if any
+        self.field = None
+
+    @property
+    def model(self):
+        return self.queryset.model
+
+    def get_url(self):
+        return reverse('jschemer-choices', kwargs={'key': self.key})
+
+    def has_permission(self, request):
+        """
+        Return True if request may read the choices. Override (or pass
+        permission) for finer checks.
+        """
+        if self.permission is not None:
+            return bool(self.permission(request))
+        return self.public
+
+    def get_page(self, search=None, after=None, limit=None):
+        """
+        Return a list of (value, label) tuples ordered by value, starting
+        after the value `after` (keyset pagination) and matching `search`.
+        """
+        page_size = get_setting('JSCHEMER_CHOICES_PAGE_SIZE')
+        if limit is None or limit > page_size:
+            limit = page_size
+        queryset = self.queryset.all()
+        if search and self.search_fields:
+            queryset = queryset.filter(reduce(operator.or_, (
+                Q(**{'{}__icontains'.format(field): search})
+                for field in self.search_fields)))
+        if after is not None:
+            queryset = queryset.filter(
+                **{'{}__gt'.format(self.value_field): after})
+        queryset = queryset.order_by(self.value_field)[:limit]
+        return choice_rows(queryset, self.value_field, self.label_field)
+
+
+class ChoiceSourceRegistry(object):
+    """
+    Registry of ChoiceSources by key. Form fields use the sources registered
+    for them with register_field(); model conversions (see
+    jsonschema.DjangoModelToJSONSchema) use those registered for a model.
+    """
+
+    def __init__(self):
+        self._registry = {}
+
+    def register(self, queryset, key=None, **kwargs):
+        """
+        Register a queryset (or model, meaning all its objects) as a choice
+        source. key defaults to 'app_label.model_name'.
+        Other kwargs are passed to ChoiceSource.
+        """
+        if inspect.isclass(queryset):
+            queryset = queryset._default_manager.all()
+        if key is None:
+            key = queryset.model._meta.label_lower
+        if key in self._registry:
+            raise ValueError("Already registered")
+        source = ChoiceSource(queryset, key, **kwargs)
+        self._registry[key] = source
+        return source
+
+    def register_field(self, form_cls, field_name, key=None, **kwargs):
+        """
+        Register the choices of a ModelChoiceField of a Form class. Only the
+        field's own queryset is served, with its to_field_name as value.
+        key defaults to the dotted path of the form plus the field name.
+        Other kwargs are passed to ChoiceSource.
+        """
+        field = form_cls.base_fields[field_name]
+        if key is None:
+            key = '{}.{}.{}'.format(form_cls.__module__, form_cls.__name__,
+                                    field_name)
+        if key in self._registry:
+            raise ValueError("Already registered")
+        source = ChoiceSource(field.queryset, key,
+                              value_field=field.to_field_name, **kwargs)
+        source.field = field
+        # Form instances get copies of the field, with the attribute
+        field.jschemer_choice_source = source
+        self._registry[key] = source
+        return source
+
+    def unregister(self, key):
+        if key not in self._registry:
+            raise ValueError("Choice source {} is Not registered".format(key))
+        source = self._registry.pop(key)
+        if source.field is not None:
+            del source.field.jschemer_choice_source
+
+    def get(self, key):
+        return self._registry.get(key)
+
+    def get_for_field(self, field):
+        """
+        Return the source registered for a form field (or a copy of it) with
+        register_field(), or None.
+        """
+        return getattr(field, 'jschemer_choice_source', None)
+
+    def get_for_model(self, model, value_field=None):
+        """
+        Return the source registered for model (not for a form field) whose
+        values are value_field (the primary key by default), or None.
+        """
+        value_field = value_field or 'pk'
+        for source in self._registry.values():
+            if (source.field is None and source.model is model and
+                    source.value_field == value_field):
+                return source
+        return None
+
+
+choice_sources = ChoiceSourceRegistry()
@@ -0,0 +1,74 @@
+from django.conf import settings
+
+# Default values for the settings django-jschemer reads. Any of them can be
+# overriden in the project settings.
+DEFAULTS = {
+    # Maximum number of compiled JSON Schema validators kept per process.
+    'JSCHEMER_VALIDATOR_CACHE_SIZE': 256,
+    # Maximum number of converted forms kept by DjangoFormToJSONSchema when
+    # it is used with use_cache=True.
+    'JSCHEMER_SCHEMA_CACHE_SIZE': 512,
+    # Maximum number of encoded data-schemajson/data-alpacaoptions attribute
+    # sets kept by JSONSchemaField.
+    'JSCHEMER_DATA_ATTRIBUTES_CACHE_SIZE': 256,
+    # Default limits for submitted JSON documents (None means no limit) and
+    # whether they are checked with an incremental parser (requires ijson).
+    'JSCHEMER_MAX_PAYLOAD_SIZE': None,
+    'JSCHEMER_MAX_DEPTH': None,
+    'JSCHEMER_MAX_CONTAINERS': None,
+    'JSCHEMER_STREAMING': False,
+    # Report all schema errors of a document instead of the most relevant
+    # one, up to a maximum count and time budget (in seconds, None means no
+    # limit).
+    'JSCHEMER_COLLECT_ERRORS': False,
+    'JSCHEMER_MAX_ERRORS': 20,
+    'JSCHEMER_ERROR_TIME_BUDGET': None,
+    # Forms exported by the jschemer_export command in addition to the ones
+    # decorated with export_schema: a list of dotted paths or a dict of
+    # {form_key: dotted path}.
+    'JSCHEMER_EXPORT_FORMS': (),
+    # Languages to export. None means [LANGUAGE_CODE].
+    'JSCHEMER_EXPORT_LANGUAGES': None,
+    # Default output directory of jschemer_export.
+    'JSCHEMER_EXPORT_DIR': None,
+    # Path of a manifest written by jschemer_export, loaded at runtime.
+    'JSCHEMER_MANIFEST': None,
+    # max-age (seconds) of schema_view responses requested without a
+    # matching content hash.
+    'JSCHEMER_SCHEMA_MAX_AGE': 3600,
+    # Maximum number of encoded schema_view payloads (one per form and
+    # language).
+    'JSCHEMER_PAYLOAD_CACHE_SIZE': 256,
+    # Seconds the schema_view payload of a form that is converted on every
+    # use (e.g. with ModelChoiceFields) is reused before converting it again.
+    'JSCHEMER_PAYLOAD_TTL': 60,
+    # ModelChoiceFields with more choices than this, and a registered choice
+    # source, get an Alpaca dataSource URL instead of an inlined enum. None
+    # means always inline.
+    'JSCHEMER_CHOICES_INLINE_LIMIT': None,
+    # Maximum number of choices returned per choices_view request.
+    'JSCHEMER_CHOICES_PAGE_SIZE': 50,
+    # JSON encoder: 'orjson', 'ujson' or 'json'. None picks the first
+    # installed in that order.
+    'JSCHEMER_JSON_BACKEND': None,
+    # Leave empty keywords and options out of converted schemas by default.
+    'JSCHEMER_COMPACT': False,
+    # Executor of async validations (see aio.get_executor) and how many of
+    # them run at once per event loop (None means the number of CPUs).
+    'JSCHEMER_ASYNC_EXECUTOR': None,
+    'JSCHEMER_ASYNC_CONCURRENCY': None,
+    # Remember validation outcomes of documents (by schema and sha256 of the
+    # document) so that resubmissions are not validated again. The cache is
+    # bounded in entries, approximate bytes and seconds.
+    'JSCHEMER_MEMOIZE_RESULTS': False,
+    'JSCHEMER_RESULT_CACHE_SIZE': 1024,
+    'JSCHEMER_RESULT_CACHE_MAX_BYTES': 1024 * 1024,
+    'JSCHEMER_RESULT_CACHE_TTL': 300,
+}
+
+
+def get_setting(name):
+    """
+    Return the project setting `name` or its django-jschemer default.
+    """
+    return getattr(settings, name, DEFAULTS[name])
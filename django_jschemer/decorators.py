@@ -1,3 +1,4 @@
+from django_jschemer.export import form_registry
 from django_jschemer.registry import field_registry
 
 
@@ -14,3 +15,20 @@ def register(field_cls, registry=None):
         registry.register(field_cls, jsonfield_cls)
         return jsonfield_cls
     return _django_field_wrapper
+
+
+def export_schema(form_key=None, schema_template=None, registry=None):
+    """
+    Class decorator that registers a Form for schema export with the
+    jschemer_export management command.
+    form_key -- unique key of the form, defaults to its dotted path.
+    If the registry is not supplied, the default export.form_registry is used.
+    """
+    if not registry:
+        registry = form_registry
+
+    def _form_wrapper(form_cls):
+        registry.register(form_cls, form_key=form_key,
+                          schema_template=schema_template)
+        return form_cls
+    return _form_wrapper
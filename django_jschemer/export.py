@@ -0,0 +1,271 @@
+"""
+Export of converted forms to static, content hashed JSON files.
+
+Forms are registered for export with the decorators.export_schema decorator
+or listed in the JSCHEMER_EXPORT_FORMS setting. The jschemer_export management
+command converts each of them for every configured language and writes a
+manifest that get_form_schema() loads at runtime instead of converting.
+"""
+import hashlib
+import inspect
+import json
+import os
+import re
+import threading
+
+from django.conf import settings
+from django.utils import translation
+from django.utils.module_loading import import_string
+
+from django_jschemer.conf import get_setting
+from django_jschemer.jsonschema import DjangoFormToJSONSchema
+from django_jschemer.jsonutil import dumps
+
+MANIFEST_VERSION = 1
+
+# Form keys are used in file names and URLs: dot separated words.
+_form_key_re = re.compile(r'^[\w-]+(\.[\w-]+)*$')
+
+
+def check_form_key(form_key):
+    """
+    Raise ValueError if form_key can not be used in file names and URLs.
+    """
+    if not isinstance(form_key, str) or not _form_key_re.match(form_key):
+        raise ValueError("Invalid form key {!r}: use letters, digits, '_', "
+                         "'-' and single dots".format(form_key))
+
+
+class ExportedForm(object):
+    def __init__(self, form_cls, form_key, schema_template=None):
+        check_form_key(form_key)
+        self.form_cls = form_cls
+        self.form_key = form_key
+        self.schema_template = schema_template
+
+    def get_converter(self):
+        return DjangoFormToJSONSchema(schema_template=self.schema_template,
+                                      form_key=self.form_key, use_cache=True)
+
+    def convert(self):
+        """
+        Convert the form in the active language.
+        """
+        return self.get_converter().convert_to_schema(self.form_cls)
+
+    def is_cacheable(self):
+        """
+        Return True if conversions of the form are cached, False if it is
+        converted on every use (e.g. it has ModelChoiceFields).
+        """
+        return self.get_converter().get_cache_key(self.form_cls) is not None
+
+
+class FormRegistry(object):
+    """
+    Registry of the forms whose schemas are exported, by form key.
+    """
+
+    def __init__(self):
+        self._registry = {}
+        # (JSCHEMER_EXPORT_FORMS value, its ExportedForms by key), built on
+        # first use and again only if the setting changes.
+        self._settings_forms = (None, None)
+        self._settings_lock = threading.Lock()
+
+    def register(self, form_cls, form_key=None, schema_template=None):
+        """
+        Register a Form class for export.
+        form_key -- unique key of the form (see check_form_key()). Defaults
+        to the dotted path of the class.
+        schema_template -- passed to DjangoFormToJSONSchema.
+        """
+        if not inspect.isclass(form_cls):
+            raise ValueError("form_cls is not a Class object")
+        if form_key is None:
+            form_key = '{}.{}'.format(form_cls.__module__, form_cls.__name__)
+        registered = self._registry.get(form_key)
+        if registered is not None and registered.form_cls is not form_cls:
+            raise ValueError("Form key {} is already registered".format(form_key))
+        self._registry[form_key] = ExportedForm(form_cls, form_key,
+                                                schema_template)
+
+    def unregister(self, form_key):
+        if form_key not in self._registry:
+            raise ValueError("Form key {} is Not registered".format(form_key))
+        del self._registry[form_key]
+
+    def get(self, form_key):
+        """
+        Return the ExportedForm for form_key, looking at the
+        JSCHEMER_EXPORT_FORMS setting if it was not registered.
+        """
+        exported = self._registry.get(form_key)
+        if exported is None:
+            exported = self._get_settings_forms().get(form_key)
+        return exported
+
+    def get_forms(self):
+        """
+        Return all exported forms (registered and from settings) by key.
+        """
+        forms = dict(self._get_settings_forms())
+        forms.update(self._registry)
+        return forms
+
+    def _get_settings_forms(self):
+        """
+        Return the ExportedForms of the JSCHEMER_EXPORT_FORMS setting by key.
+        Treat the result as read only.
+        """
+        declared = get_setting('JSCHEMER_EXPORT_FORMS')
+        built_from, forms = self._settings_forms
+        if forms is not None and built_from is declared:
+            return forms
+        with self._settings_lock:
+            built_from, forms = self._settings_forms
+            if forms is None or built_from is not declared:
+                if isinstance(declared, dict):
+                    paths = declared.items()
+                else:
+                    paths = ((path, path) for path in declared)
+                forms = dict((form_key,
+                              ExportedForm(import_string(path), form_key))
+                             for form_key, path in paths)
+                self._settings_forms = (declared, forms)
+        return forms
+
+
+form_registry = FormRegistry()
+
+
+def get_export_languages():
+    languages = get_setting('JSCHEMER_EXPORT_LANGUAGES')
+    if languages is None:
+        languages = [settings.LANGUAGE_CODE]
+    return languages
+
+
+def content_hash(content):
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+def export_forms(output_dir, languages=None, forms=None):
+    """
+    Convert forms (by default every exported form) for each language and
+    write minified, content hashed schema and options files plus a
+    manifest.json to output_dir. Returns the manifest.
+    """
+    if languages is None:
+        languages = get_export_languages()
+    if forms is None:
+        forms = form_registry.get_forms()
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    manifest = {'version': MANIFEST_VERSION, 'forms': {}}
+    for form_key, exported in sorted(forms.items()):
+        entries = manifest['forms'][form_key] = {}
+        for language in languages:
+            with translation.override(language):
+                schema, options = exported.convert()
+                entry = {}
+                for kind, obj in (('schema', schema), ('options', options)):
+                    content = dumps(obj)
+                    digest = content_hash(content)
+                    entry[kind + '_size'] = len(content.encode('utf-8'))
+                    filename = '{}.{}.{}.{}.json'.format(form_key, language,
+                                                         kind, digest)
+                    with open(os.path.join(output_dir, filename), 'w',
+                              encoding='utf-8') as output:
+                        output.write(content)
+                    entry[kind] = filename
+                    entry[kind + '_hash'] = digest
+                entries[language] = entry
+
+    with open(os.path.join(output_dir, 'manifest.json'), 'w',
+              encoding='utf-8') as output:
+        json.dump(manifest, output, indent=2, sort_keys=True)
+    return manifest
+
+
+class Manifest(object):
+    """
+    A loaded export manifest. Exported files are read on first use.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.base_dir = os.path.dirname(os.path.abspath(path))
+        with open(path, encoding='utf-8') as manifest_file:
+            self.data = json.load(manifest_file)
+        if self.data.get('version') != MANIFEST_VERSION:
+            raise ValueError("Unsupported manifest version in {}".format(path))
+        self._loaded = {}
+
+    def get_entry(self, form_key, language):
+        return self.data['forms'].get(form_key, {}).get(language)
+
+    def get(self, form_key, language):
+        """
+        Return (schema, options) for form_key and language or None if they
+        were not exported.
+        """
+        cache_key = (form_key, language)
+        loaded = self._loaded.get(cache_key)
+        if loaded is None:
+            entry = self.get_entry(form_key, language)
+            if entry is None:
+                return None
+            loaded = tuple(self._load(entry[kind])
+                           for kind in ('schema', 'options'))
+            self._loaded[cache_key] = loaded
+        return loaded
+
+    def _load(self, filename):
+        with open(os.path.join(self.base_dir, filename),
+                  encoding='utf-8') as exported:
+            return json.load(exported)
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest():
+    """
+    Return the Manifest configured with JSCHEMER_MANIFEST, or None.
+    """
+    path = get_setting('JSCHEMER_MANIFEST')
+    if not path:
+        return None
+    manifest = _manifests.get(path)
+    if manifest is None:
+        with _manifests_lock:
+            manifest = _manifests.get(path)
+            if manifest is None:
+                manifest = _manifests[path] = Manifest(path)
+    return manifest
+
+
+def get_form_schema(form_key, language=None):
+    """
+    Return (schema, options) of an exported form in language (default: the
+    active language). They come from the manifest if the form was exported
+    for that language, otherwise the form is converted (and cached).
+    Treat them as read only.
+
+    Raises KeyError if form_key is neither in the manifest nor registered.
+    """
+    if language is None:
+        language = translation.get_language()
+    manifest = get_manifest()
+    if manifest is not None:
+        exported = manifest.get(form_key, language)
+        if exported is not None:
+            return exported
+    exported_form = form_registry.get(form_key)
+    if exported_form is None:
+        raise KeyError("Unknown form key: {}".format(form_key))
+    with translation.override(language):
+        return exported_form.convert()
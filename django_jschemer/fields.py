@@ -7,28 +7,80 @@
 # there.
 from django import forms
 #from django_jschemer.decorators import register
+from django_jschemer.choices import (choice_rows, choice_sources,
+                                     get_choice_label)
+from django_jschemer.conf import get_setting
 from django_jschemer.registry import field_registry
 
 
+class FieldAttribute(object):
+    """
+    Attribute of a schema field that reads the attribute of the same name of
+    its form field, unless it was assigned on the schema field.
+    """
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self.default = default
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        overrides = instance._overrides
+        if overrides and self.name in overrides:
+            return overrides[self.name]
+        return getattr(instance.field, self.name, self.default)
+
+    def __set__(self, instance, value):
+        if instance._overrides is None:
+            instance._overrides = {}
+        instance._overrides[self.name] = value
+
+    def __delete__(self, instance):
+        if instance._overrides:
+            instance._overrides.pop(self.name, None)
+
+
 class BaseDjangoJSONSchemaField(object):
-    def __init__(self, field, name):
+    """
+    Converts a form field to a JSON Schema part and Alpaca options.
+
+    Instances only hold the field, its name and the options being built, and
+    read everything else from the field. Converters reuse one instance per
+    class with bind(), so subclasses that keep state per field must declare
+    it in __slots__ and reset it in bind(). Subclasses without __slots__ get
+    a __dict__ and a new instance per field, and so do instances that assign
+    one of the field attributes below (e.g. self.widget) in __init__.
+    """
+    __slots__ = ('field', 'name', '_alpaca_options', '_overrides')
+
+    label_suffix = FieldAttribute('label_suffix')
+    initial = FieldAttribute('initial')
+    widget = FieldAttribute('widget')
+    help_text = FieldAttribute('help_text')
+    error_messages = FieldAttribute('error_messages')
+    validators = FieldAttribute('validators')
+    localize = FieldAttribute('localize')
+    # Added in Django 1.9 so we default to False if not found
+    disabled = FieldAttribute('disabled', False)
+
+    def __init__(self, field=None, name=None):
         """
         Initialize a JSON Schema representation object based on a Field
         field -- the form field object.
         name -- the name of the field object in the form.
         """
+        self._overrides = None
+        self.bind(field, name)
+
+    def bind(self, field, name):
+        """
+        Prepare this instance to convert another field and return it.
+        """
         self.field = field
         self.name = name
-        self.label_suffix = field.label_suffix
-        self.initial = field.initial
-        self.widget = field.widget
-        self.help_text = field.help_text
-        self.error_messages = field.error_messages
-        self.validators = field.validators
-        self.localize = field.localize
-        # Added in Django 1.9 so we default to False if not found
-        self.disabled = getattr(field, 'disabled', False)
         self._alpaca_options = {}
+        return self
 
     def get_type(self):
         """
@@ -66,13 +118,19 @@ class BaseDjangoJSONSchemaField(object):
         """
         return None
 
-    def get_schema_part(self):
+    def get_schema_part(self, lazy=False):
         """
         Returns the schema definition for this field
+
+        lazy -- keep lazy translation strings in title and description, for
+        the caller to resolve in the language it needs.
         """
+        title, description = self.get_label(), self.help_text
+        if not lazy:
+            title, description = str(title), str(description)
         part = {
-            'title': str(self.get_label()),
-            'description': str(self.help_text),
+            'title': title,
+            'description': description,
             'type': self.get_type(),
         }
         # if we have initial value, add it to 'default' keyword
@@ -111,6 +169,7 @@ class BaseDjangoJSONSchemaField(object):
 
 
 class BooleanField(BaseDjangoJSONSchemaField):
+    __slots__ = ()
 
     def get_type(self):
         return "boolean"
@@ -118,12 +177,15 @@ field_registry.register(forms.BooleanField, BooleanField)
 
 
 class NullBooleanField(BooleanField):
+    __slots__ = ()
+
     # XXX How is Null value handled? needs testing
     pass
 field_registry.register(forms.NullBooleanField, NullBooleanField)
 
 
 class CharField(BaseDjangoJSONSchemaField):
+    __slots__ = ()
 
     def get_type(self):
         return "string"
@@ -138,6 +200,7 @@ field_registry.register(forms.CharField, CharField)
 
 
 class RegexField(CharField):
+    __slots__ = ()
 
     def update_part(self, part):
         part = super().update_part(part)
@@ -146,6 +209,7 @@ field_registry.register(forms.RegexField, RegexField)
 
 
 class URLField(CharField):
+    __slots__ = ()
 
     def get_format(self):
         # is URL supported. For now URI
@@ -154,6 +218,7 @@ field_registry.register(forms.URLField, URLField)
 
 
 class UUIDField(BaseDjangoJSONSchemaField):
+    __slots__ = ()
 
     def get_type(self):
         return "string"
@@ -161,6 +226,7 @@ field_registry.register(forms.UUIDField, UUIDField)
 
 
 class DateField(BaseDjangoJSONSchemaField):
+    __slots__ = ()
 
     def get_type(self):
         return "string"
@@ -171,6 +237,7 @@ field_registry.register(forms.DateField, DateField)
 
 
 class DateTimeField(DateField):
+    __slots__ = ()
 
     def get_format(self):
         return "datetime"
@@ -178,6 +245,7 @@ field_registry.register(forms.DateTimeField, DateTimeField)
 
 
 class TimeField(DateField):
+    __slots__ = ()
 
     def get_format(self):
         return "time"
@@ -185,6 +253,8 @@ field_registry.register(forms.TimeField, TimeField)
 
 
 class IntegerField(BaseDjangoJSONSchemaField):
+    __slots__ = ()
+
     def get_type(self):
         return "integer"
 
@@ -203,11 +273,23 @@ field_registry.register(forms.IntegerField, IntegerField)
 
 
 class DecimalField(IntegerField):
+    __slots__ = ()
+
     def get_type(self):
         return "number"
 field_registry.register(forms.DecimalField, DecimalField)
 
+
+class FloatField(IntegerField):
+    __slots__ = ()
+
+    def get_type(self):
+        return "number"
+field_registry.register(forms.FloatField, FloatField)
+
 class EmailField(CharField):
+    __slots__ = ()
+
     def get_type(self):
         return "string"
 
@@ -216,6 +298,8 @@ class EmailField(CharField):
 field_registry.register(forms.EmailField, EmailField)
 
 class FileField(BaseDjangoJSONSchemaField):
+    __slots__ = ()
+
     def get_type(self):
         return "string"
     # TODO this obviously would not work as is.
@@ -223,6 +307,8 @@ field_registry.register(forms.FileField, FileField)
 
 
 class GenericIPAddressField(BaseDjangoJSONSchemaField):
+    __slots__ = ()
+
     def get_type(self):
         return "string"
 
@@ -233,6 +319,8 @@ field_registry.register(forms.GenericIPAddressField, GenericIPAddressField)
 
 
 class ChoiceField(BaseDjangoJSONSchemaField):
+    __slots__ = ()
+
     # XXX this is a stub. We need to add enum, check the widget etc etc
     def get_type(self):
         return "string"
@@ -249,8 +337,121 @@ class ChoiceField(BaseDjangoJSONSchemaField):
 field_registry.register(forms.ChoiceField, ChoiceField)
 
 
+class MultipleChoiceField(ChoiceField):
+    """
+    An array of the choices, since a list of them is submitted.
+    """
+    __slots__ = ()
+
+    def get_type(self):
+        return "array"
+
+    def update_part(self, part):
+        part['items'] = {
+            'type': "string",
+            'enum': [choice[0] for choice in self.widget.choices],
+        }
+        return part
+
+    def update_alpaca_options(self, options=None):
+        super(MultipleChoiceField, self).update_alpaca_options(options)
+        self._alpaca_options["multiple"] = True
+field_registry.register(forms.MultipleChoiceField, MultipleChoiceField)
+
+
 class ModelChoiceField(ChoiceField):
+    """
+    Choices are fetched once per conversion with a single query, as
+    (value, label) rows, the value being the field's to_field_name. If a
+    label_field is configured for the field (see choices.set_choice_label(),
+    or the label_field of its choice source) it is selected instead of
+    building model instances for label_from_instance().
+
+    If the relation has more than JSCHEMER_CHOICES_INLINE_LIMIT objects and a
+    choice source is registered for the field, the choices are not inlined. The Alpaca
+    options point to the source's URL instead and at most limit + 1 rows are
+    fetched.
+    """
+    __slots__ = ('_choices', '_choice_source')
+
+    def bind(self, field, name):
+        self._choices = None
+        self._choice_source = None
+        return super(ModelChoiceField, self).bind(field, name)
+
     def get_type(self):
         return "number"  # modelchoice by default returns ( Primary Key ,  __str__ ) tuples
 
+    def _load_choices(self):
+        field = self.field
+        source = choice_sources.get_for_field(field)
+        limit = get_setting('JSCHEMER_CHOICES_INLINE_LIMIT')
+        queryset = field.queryset.all()
+        if source is not None and limit is not None:
+            queryset = queryset[:limit + 1]
+        rows = choice_rows(queryset, field.to_field_name or 'pk',
+                           get_choice_label(field), field.label_from_instance)
+        if source is not None and limit is not None and len(rows) > limit:
+            self._choice_source = source
+            self._choices = ()
+        else:
+            if field.empty_label is not None:
+                rows.insert(0, ("", field.empty_label))
+            self._choices = rows
+
+    def get_choices(self):
+        """
+        Return the list of (value, label) choices to inline.
+        """
+        if self._choices is None:
+            self._load_choices()
+        return self._choices
+
+    def get_choice_source(self):
+        """
+        Return the ChoiceSource to reference instead of inlining the choices,
+        or None.
+        """
+        if self._choices is None:
+            self._load_choices()
+        return self._choice_source
+
+    def update_part(self, part):
+        if self.get_choice_source() is None:
+            part['enum'] = [choice[0] for choice in self.get_choices()]
+        return part
+
+    def update_alpaca_options(self, options=None):
+        self._alpaca_options["type"] = "select"
+        source = self.get_choice_source()
+        if source is not None:
+            self._alpaca_options["dataSource"] = source.get_url()
+        else:
+            self._alpaca_options["optionLabels"] = [
+                choice[1] for choice in self.get_choices()]
+
 field_registry.register(forms.ModelChoiceField, ModelChoiceField)
+
+
+class ModelMultipleChoiceField(ModelChoiceField):
+    """
+    An array of the choices of a ModelChoiceField, since a list of them is
+    submitted.
+    """
+    __slots__ = ()
+
+    def get_type(self):
+        return "array"
+
+    def update_part(self, part):
+        items = {'type': super(ModelMultipleChoiceField, self).get_type()}
+        part['items'] = super(ModelMultipleChoiceField, self).update_part(
+            items)
+        return part
+
+    def update_alpaca_options(self, options=None):
+        super(ModelMultipleChoiceField, self).update_alpaca_options(options)
+        self._alpaca_options["multiple"] = True
+
+field_registry.register(forms.ModelMultipleChoiceField,
+                        ModelMultipleChoiceField)
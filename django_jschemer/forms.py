@@ -1,29 +1,236 @@
-import json
+import time
+from functools import partial
 
-from jsonschema import validate, FormatChecker,  ValidationError as JSONSchemaValidationError
+from jsonschema.exceptions import best_match
 
 from django import forms
 from django.core.exceptions import ValidationError
-from django_jschemer.jsonutil import LazyEncoder
+from django.utils.functional import lazy
+from django.utils.translation import get_language
+from django_jschemer import signals
+from django_jschemer.aio import validate_async
+from django_jschemer.batch import validate_batch
+from django_jschemer.cache import LRUCache, lazy_cache
+from django_jschemer.conf import get_setting
+from django_jschemer.export import get_form_schema
+from django_jschemer.jsonutil import dumps, schema_fingerprint
+from django_jschemer.validation import (collect_errors, format_path,
+                                        get_result_cache, get_validator,
+                                        load_json, payload_digest)
+from django_jschemer.views import get_schema_url
 
 
 class SchemaValidator(object):
-    def __init__(self, schema):
-        self.schema = schema
+    """
+    Validates a JSON encoded value against a JSON Schema.
+
+    The compiled validator is shared between all SchemaValidators (and thus
+    JSONSchemaFields) that use the same schema, so the metaschema check and
+    validator setup happen once per schema and not once per submission.
+
+    max_payload_size -- reject documents larger than this many bytes.
+    max_depth -- reject documents nested deeper than this.
+    max_containers -- reject documents with more arrays and objects.
+    streaming -- check the limits with an incremental parser (requires
+    ijson).
+    collect_errors -- report every schema error (one ValidationError per
+    error, each with its JSON path in params['path']) instead of only the
+    most relevant one.
+    max_errors, error_time_budget -- stop collecting errors after this many
+    errors or seconds.
+    memoize -- remember the outcome per document (see
+    validation.get_result_cache()), so that resubmitting the same document
+    costs a hash instead of a validation.
+    Each defaults to the matching JSCHEMER_* setting.
+    """
+    message = '%(path)s: %(message)s'
+    code = 'schema'
+
+    def __init__(self, schema, max_payload_size=None, max_depth=None,
+                 streaming=None, collect_errors=None, max_errors=None,
+                 error_time_budget=None, memoize=None, max_containers=None):
+        self._schema = schema
+        self._fingerprint = None
+        self._fingerprinted = None
+        if max_payload_size is None:
+            max_payload_size = get_setting('JSCHEMER_MAX_PAYLOAD_SIZE')
+        if max_depth is None:
+            max_depth = get_setting('JSCHEMER_MAX_DEPTH')
+        if max_containers is None:
+            max_containers = get_setting('JSCHEMER_MAX_CONTAINERS')
+        if streaming is None:
+            streaming = get_setting('JSCHEMER_STREAMING')
+        if collect_errors is None:
+            collect_errors = get_setting('JSCHEMER_COLLECT_ERRORS')
+        if max_errors is None:
+            max_errors = get_setting('JSCHEMER_MAX_ERRORS')
+        if error_time_budget is None:
+            error_time_budget = get_setting('JSCHEMER_ERROR_TIME_BUDGET')
+        if memoize is None:
+            memoize = get_setting('JSCHEMER_MEMOIZE_RESULTS')
+        self.max_payload_size = max_payload_size
+        self.max_depth = max_depth
+        self.max_containers = max_containers
+        self.streaming = streaming
+        self.collect_errors = collect_errors
+        self.max_errors = max_errors
+        self.error_time_budget = error_time_budget
+        self.memoize = memoize
+
+    @property
+    def schema(self):
+        """
+        The schema, or what the callable given instead of a schema returns.
+        """
+        if callable(self._schema):
+            return self._schema()
+        return self._schema
+
+    @property
+    def fingerprint(self):
+        """
+        Stable identifier of the schema, computed on first use (and again if
+        a schema callable returns another object).
+        """
+        schema = self.schema
+        if self._fingerprinted is not schema:
+            self._fingerprint = schema_fingerprint(schema)
+            self._fingerprinted = schema
+        return self._fingerprint
+
+    def get_validator(self):
+        return get_validator(self.schema, self.fingerprint)
+
+    async def acall(self, value, **kwargs):
+        """
+        Validate without blocking the event loop. See
+        django_jschemer.aio.validate_async() for kwargs.
+        """
+        return await validate_async(self, value, **kwargs)
+
+    def validate_many(self, documents, **kwargs):
+        """
+        Validate an iterable of JSON documents, yielding a BatchResult per
+        document. See django_jschemer.batch.validate_batch() for kwargs.
+        """
+        return validate_batch(self, documents, **kwargs)
 
     def __call__(self, value):
+        if not signals.validation_finished.receivers:
+            return self.validate(value)
+        start = time.perf_counter()
+        valid, error_count = False, 0
+        try:
+            result = self.validate(value)
+            valid = True
+            return result
+        except ValidationError as error:
+            error_count = len(error.error_list)
+            raise
+        finally:
+            signals.validation_finished.send(
+                sender=self.__class__, validator=self,
+                duration=time.perf_counter() - start,
+                payload_size=len(value) if value is not None else 0,
+                valid=valid, error_count=error_count)
+
+    def get_result_key(self, value):
+        """
+        Return the key the outcome of validating value is memoized under.
+        """
+        return (self.fingerprint, self.max_payload_size, self.max_depth,
+                self.max_containers, self.streaming, self.collect_errors,
+                self.max_errors, self.error_time_budget,
+                payload_digest(value))
+
+    def validate(self, value):
+        """
+        Validate the JSON encoded value, raising ValidationError if it is not
+        valid. Returns the value.
+        """
+        if not self.memoize or not isinstance(value, (str, bytes)):
+            return self._validate(value)
+        cache = get_result_cache()
+        key = self.get_result_key(value)
+        errors = cache.get(key)
+        if errors is None:
+            try:
+                self._validate(value)
+            except ValidationError as error:
+                errors = tuple((e.message, e.code, e.params)
+                               for e in error.error_list)
+            else:
+                errors = ()
+            cache.set(key, errors)
+        if errors:
+            raise ValidationError([
+                ValidationError(message, code=code, params=params)
+                for message, code, params in errors])
+        return value
+
+    def _validate(self, value):
         try:
-            decoded_value = json.loads(value)
+            decoded_value = load_json(value,
+                                      max_size=self.max_payload_size,
+                                      max_depth=self.max_depth,
+                                      streaming=self.streaming,
+                                      max_containers=self.max_containers)
         except ValueError as error:
             raise ValidationError(str(error))
-        try:
-            validate(decoded_value,
-                     self.schema,
-                     format_checker=FormatChecker())
-        except JSONSchemaValidationError as error:
-            raise ValidationError('%s: %s' % ('.'.join(error.path), error.message))
+        validator = self.get_validator()
+        if self.collect_errors:
+            errors = collect_errors(validator, decoded_value,
+                                    max_errors=self.max_errors,
+                                    time_budget=self.error_time_budget)
+        else:
+            error = best_match(validator.iter_errors(decoded_value))
+            errors = [error] if error is not None else []
+        if errors:
+            raise ValidationError([self.to_django_error(error)
+                                   for error in errors])
         return value
 
+    def to_django_error(self, error):
+        """
+        Convert a jsonschema ValidationError to a Django ValidationError.
+        """
+        return ValidationError(self.message, code=self.code,
+                               params={'path': format_path(error.path),
+                                       'message': error.message})
+
+
+@lazy_cache
+def get_data_attributes_cache():
+    """
+    Return the process wide cache of encoded JSONSchemaField data attributes.
+    """
+    return LRUCache(maxsize=get_setting('JSCHEMER_DATA_ATTRIBUTES_CACHE_SIZE'),
+                    name='data_attributes')
+
+
+def _data_attribute(field, name):
+    return field.get_data_attributes().get(name, '')
+
+
+# Widget attributes are built once, when the field is constructed. Rendering
+# them lazily lets them follow the active language and schema changes.
+lazy_data_attribute = lazy(_data_attribute, str)
+
+
+def _schema_url(field):
+    return field.get_schema_url()
+
+
+lazy_schema_url = lazy(_schema_url, str)
+
+
+def _exported_schema(form_key):
+    return get_form_schema(form_key)[0]
+
+
+def _exported_options(form_key):
+    return get_form_schema(form_key)[1]
+
 
 class JSONSchemaFormWidget(forms.widgets.HiddenInput):
     """
@@ -43,29 +250,158 @@ class JSONSchemaField(forms.CharField):
     Javascript is loaded to convert the field into an Alpacajs powered form: http://www.alpacajs.org/
 
     Upon return validate the submission using python-jsonschema
+
+    The encoded data attributes are computed once per schema, options and
+    active language and reused by every render and every field built from the
+    same schema and options objects. Treat them as immutable once passed in;
+    assign new ones to have the attributes re-encoded.
+
+    If schema_url is given, the widget gets a data-schemaurl attribute
+    instead and the schema and options are loaded from there by the browser
+    (see JSONSchemaField.for_form() and views.schema_view).
+
+    schema and options can also be callables, called whenever the field is
+    rendered or validates, e.g. to follow the active language.
     '''
     widget = JSONSchemaFormWidget
 
-    def __init__(self, schema, options=None, **kwargs):
+    def __init__(self, schema, options=None, validator_options=None,
+                 schema_url=None, fieldkey=None, **kwargs):
+        """
+        schema -- the JSON Schema to render and validate against (or a
+        callable returning it).
+        options -- Alpaca options (or a callable returning them).
+        validator_options -- extra keyword arguments for SchemaValidator.
+        schema_url -- URL (or callable returning it) serving the schema and
+        options, to reference them instead of inlining them.
+        fieldkey -- identifies the field in the browser. Defaults to the
+        schema's id (if schema is not a callable).
+        """
         self.schema = schema
-        self.fieldkey = schema.get('id',None)
-        self.options = options or {}
+        if fieldkey is None and not callable(schema):
+            fieldkey = schema.get('id', None)
+        self.fieldkey = fieldkey
+        self.options = options
+        self.schema_url = schema_url
         super(JSONSchemaField, self).__init__(**kwargs)
-        self.validators.append(SchemaValidator(schema=schema))
+        self.validators.append(SchemaValidator(schema=schema,
+                                               **(validator_options or {})))
+
+    @property
+    def schema(self):
+        if callable(self._schema):
+            return self._schema()
+        return self._schema
+
+    @schema.setter
+    def schema(self, schema):
+        self._schema = schema
+
+    @property
+    def options(self):
+        options = self._options
+        if callable(options):
+            options = options()
+        return options or {}
+
+    @options.setter
+    def options(self, options):
+        self._options = options
+
+    @classmethod
+    def for_form(cls, form_key, inline=True, **kwargs):
+        """
+        Return a JSONSchemaField for an exported form (see
+        export.get_form_schema()). The schema and options are looked up when
+        the field is rendered or validates, in the active language, not when
+        the field is built.
+        inline -- if False, the widget references views.schema_view instead
+        of inlining the schema and options, so browsers and CDNs can cache
+        them across pages. Requires django_jschemer.urls in the URLconf.
+        """
+        if not inline:
+            kwargs['schema_url'] = partial(get_schema_url, form_key)
+        return cls(schema=partial(_exported_schema, form_key),
+                   options=partial(_exported_options, form_key),
+                   fieldkey=form_key, **kwargs)
+
+    async def aclean(self, value, **kwargs):
+        """
+        Like clean(), but run the schema validation without blocking the
+        event loop. See django_jschemer.aio.validate_async() for kwargs.
+        """
+        value = self.to_python(value)
+        self.validate(value)
+        if value in self.empty_values:
+            return value
+        # Same as Field.run_validators()
+        errors = []
+        for validator in self.validators:
+            try:
+                if isinstance(validator, SchemaValidator):
+                    await validator.acall(value, **kwargs)
+                else:
+                    validator(value)
+            except ValidationError as error:
+                if hasattr(error, 'code') and error.code in self.error_messages:
+                    error.message = self.error_messages[error.code]
+                errors.extend(error.error_list)
+        if errors:
+            raise ValidationError(errors)
+        return value
+
+    def get_schema_url(self):
+        if callable(self.schema_url):
+            return self.schema_url()
+        return self.schema_url
 
     def widget_attrs(self, widget):
         attrs = super(JSONSchemaField, self).widget_attrs(widget)
-        attrs.update(self.get_data_attributes())
+        if self.schema_url:
+            attrs['data-schemaurl'] = lazy_schema_url(self)
+        elif callable(self._schema) or callable(self._options):
+            # Not known yet, empty options render as an empty attribute
+            for name in ('data-schemajson', 'data-alpacaoptions'):
+                attrs[name] = lazy_data_attribute(self, name)
+        else:
+            for name in self.get_data_attributes():
+                attrs[name] = lazy_data_attribute(self, name)
         attrs['data-fieldkey'] = self.fieldkey
         attrs['data-alpaca'] = "true" # Should AlpacaJS use this?
         return attrs
 
     def get_data_attributes(self):
+        """
+        Return the data-* attributes holding the encoded schema and options.
+        """
+        options = self.options or None
+        cache_key = (id(self.schema), id(options), get_language())
+        cache = get_data_attributes_cache()
+        cached = cache.get(cache_key)
+        # The cache holds references to schema and options so their ids can
+        # not be reused while the entry exists.
+        if cached is None or cached[0] is not self.schema or cached[1] is not options:
+            cached = (self.schema, options, self.encode_data_attributes())
+            cache.set(cache_key, cached)
+        return cached[2].copy()
+
+    def encode_data_attributes(self):
+        """
+        Encode the schema and options as data-* attributes.
+        """
+        if not signals.json_encoded.receivers:
+            return self._encode_data_attributes()
+        start = time.perf_counter()
+        data_attr = self._encode_data_attributes()
+        signals.json_encoded.send(
+            sender=self.__class__, duration=time.perf_counter() - start,
+            size=sum(len(value) for value in data_attr.values()))
+        return data_attr
 
-        data_attr = {'data-schemajson': json.dumps(self.schema, cls=LazyEncoder)}
+    def _encode_data_attributes(self):
+        data_attr = {'data-schemajson': dumps(self.schema)}
         if self.options:
-            data_attr.update({'data-alpacaoptions': json.dumps(self.options,
-                                                               cls=LazyEncoder)})
+            data_attr.update({'data-alpacaoptions': dumps(self.options)})
         return data_attr
 
 
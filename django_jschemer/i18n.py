@@ -0,0 +1,45 @@
+"""
+Keeps the caches of translated output in sync with the translation catalogs.
+
+Converted schemas, encoded data attributes and schema view responses are
+cached per language. They are dropped when a setting that affects
+translations changes (e.g. override_settings in tests) or when the
+autoreloader sees a changed .mo file.
+"""
+from django.core.signals import setting_changed
+
+try:
+    from django.utils.autoreload import file_changed
+except ImportError:  # Django < 2.2
+    file_changed = None
+
+TRANSLATION_SETTINGS = frozenset(['LANGUAGES', 'LANGUAGE_CODE', 'LOCALE_PATHS'])
+
+
+def clear_translation_caches():
+    """
+    Drop every cached output that contains translated strings.
+    """
+    from django_jschemer.forms import get_data_attributes_cache
+    from django_jschemer.jsonschema import get_schema_cache
+    from django_jschemer.views import get_payload_cache
+    for cache in (get_schema_cache(), get_data_attributes_cache(),
+                  get_payload_cache()):
+        cache.clear()
+
+
+def translation_setting_changed(setting, **kwargs):
+    if setting in TRANSLATION_SETTINGS:
+        clear_translation_caches()
+
+
+def translation_file_changed(file_path, **kwargs):
+    if str(file_path).endswith('.mo'):
+        clear_translation_caches()
+
+
+setting_changed.connect(translation_setting_changed,
+                        dispatch_uid='jschemer_translation_setting_changed')
+if file_changed is not None:
+    file_changed.connect(translation_file_changed,
+                         dispatch_uid='jschemer_translation_file_changed')
@@ -1,7 +1,350 @@
+import copy
 import inspect
+import time
+import weakref
 from collections import OrderedDict
+from itertools import chain
+
+from django import forms
+from django.db import models
+from django.forms.formsets import BaseFormSet
+from django.db.models.query import QuerySet
+from django.utils.text import capfirst
+from django.utils.translation import get_language, ugettext_lazy as _
+
+from django_jschemer.cache import LRUCache, lazy_cache
+from django_jschemer import signals
+from django_jschemer.choices import choice_sources
+from django_jschemer.conf import get_setting
+from django_jschemer import i18n  # noqa: clears caches on catalog changes
+from django_jschemer.jsonutil import (dumps, resolve_promises,
+                                      schema_fingerprint)
 from django_jschemer.registry import field_registry
-from deepmerge import Merger
+
+
+@lazy_cache
+def get_schema_cache():
+    """
+    Return the process wide cache of converted forms used by
+    DjangoFormToJSONSchema(use_cache=True).
+    """
+    return LRUCache(maxsize=get_setting('JSCHEMER_SCHEMA_CACHE_SIZE'),
+                    name='schemas')
+
+
+def _same_value(value, other):
+    if value is other:
+        return True
+    if isinstance(value, QuerySet) or isinstance(other, QuerySet):
+        # Never compare querysets with == since that evaluates them.
+        try:
+            return (value.model is other.model and
+                    str(value.query) == str(other.query))
+        except Exception:
+            return False
+    try:
+        return bool(value == other)
+    except Exception:
+        return False
+
+
+def _same_field(field, base_field):
+    """
+    Check if a form instance field is still equivalent to the class level
+    field it was deep copied from.
+    """
+    if field is base_field:
+        return True
+    if field.__class__ is not base_field.__class__:
+        return False
+    field_attrs, base_attrs = vars(field), vars(base_field)
+    if field_attrs.keys() != base_attrs.keys():
+        return False
+    for attr, value in field_attrs.items():
+        if attr == 'widget':
+            widget, base_widget = value, base_attrs[attr]
+            # widget choices mirror the field's choices/queryset that are
+            # compared below.
+            if (widget.__class__ is not base_widget.__class__ or
+                    widget.attrs != base_widget.attrs):
+                return False
+        elif not _same_value(value, base_attrs[attr]):
+            return False
+    return True
+
+
+def form_fields_changed(form):
+    """
+    Return True if form is a Form instance whose `fields` differ from the
+    class level `base_fields`.
+    """
+    if inspect.isclass(form) or not hasattr(form, 'fields'):
+        return False
+    fields, base_fields = form.fields, form.base_fields
+    if list(fields) != list(base_fields):
+        return True
+    for name, field in fields.items():
+        if not _same_field(field, base_fields[name]):
+            return True
+    return False
+
+
+class Nested(object):
+    """
+    Declares a Form or FormSet class in SchemerOptions.nested with the
+    options of a form field. Plain classes in SchemerOptions.nested are
+    nested with the defaults.
+
+    form -- the Form or FormSet class to nest.
+    required -- whether documents must contain the nested property.
+    label -- the title of the nested property. Defaults to its pretty name.
+    """
+
+    def __init__(self, form, required=True, label=None):
+        self.form = form
+        self.required = required
+        self.label = label
+
+
+def has_queryset_fields(form, _seen=None):
+    """
+    Return True if form (a Form class or instance), or a form nested in it
+    (see SchemerOptions.nested), has fields whose choices come from a
+    queryset. Their conversion depends on the database.
+    """
+    form_cls = form if inspect.isclass(form) else form.__class__
+    seen = _seen if _seen is not None else set()
+    if form_cls in seen:
+        return False
+    seen.add(form_cls)
+    fields = form.base_fields
+    if not inspect.isclass(form) and hasattr(form, 'fields'):
+        fields = form.fields
+    for field in fields.values():
+        if isinstance(field, forms.ModelChoiceField):
+            return True
+    meta_options = getattr(form_cls, "SchemerOptions", None)
+    for nested in getattr(meta_options, "nested", {}).values():
+        if isinstance(nested, Nested):
+            nested = nested.form
+        if issubclass(nested, BaseFormSet):
+            nested = nested.form
+        if has_queryset_fields(nested, seen):
+            return True
+    return False
+
+
+def merge_plan(overrides, path=()):
+    """
+    Flatten a dictionary of (nested) overrides to a tuple of (path, value)
+    pairs, one per leaf. Empty dicts are leaves too, meaning that a dict must
+    exist at that path.
+    """
+    plan = []
+    for key, value in overrides.items():
+        if isinstance(value, dict) and value:
+            plan.extend(merge_plan(value, path + (key,)))
+        else:
+            plan.append((path + (key,), value))
+    return tuple(plan)
+
+
+def apply_merge_plan(target, plan):
+    """
+    Deep merge the overrides of a merge_plan() into the target dict: nested
+    dicts are merged and any other value replaces what is in target.
+    """
+    for path, value in plan:
+        node = target
+        for key in path[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            node = child
+        if isinstance(value, dict):
+            if not isinstance(node.get(path[-1]), dict):
+                node[path[-1]] = {}
+        else:
+            node[path[-1]] = value
+    return target
+
+
+_merge_plans = weakref.WeakKeyDictionary()
+
+
+def get_merge_plans(meta_options):
+    """
+    Return the (options, schema) merge plans of a SchemerOptions class,
+    computed on first use.
+    """
+    plans = _merge_plans.get(meta_options)
+    if plans is None:
+        plans = _merge_plans[meta_options] = (
+            merge_plan(getattr(meta_options, "options", {})),
+            merge_plan(getattr(meta_options, "schema", {})))
+    return plans
+
+
+# Schema keywords left out by compact_output() when they have these values
+EMPTY_KEYWORDS = {'title': '', 'description': '', 'required': []}
+
+# Alpaca options left out by compact_output(drop_alpaca_defaults=True) when
+# they have the value Alpaca uses anyway.
+ALPACA_OPTION_DEFAULTS = {
+    'helper': '',
+    'helpers': [],
+    'readonly': False,
+    'disabled': False,
+    'hidden': False,
+}
+
+
+def _compact_schema(part):
+    for keyword, empty in EMPTY_KEYWORDS.items():
+        if keyword in part and part[keyword] == empty:
+            del part[keyword]
+    for keyword in ('properties', 'definitions'):
+        for subpart in part.get(keyword, {}).values():
+            _compact_schema(subpart)
+    if isinstance(part.get('items'), dict):
+        _compact_schema(part['items'])
+
+
+def _drop_alpaca_defaults(options, part=None):
+    for option, default in ALPACA_OPTION_DEFAULTS.items():
+        if option in options and options[option] == default:
+            del options[option]
+    # Alpaca labels choices with their values by default
+    labels = options.get('optionLabels')
+    if (labels is not None and part and 'enum' in part and
+            labels == [str(value) for value in part['enum']]):
+        del options['optionLabels']
+
+
+def _dereference(part, schema):
+    ref = part.get('$ref')
+    if isinstance(ref, str) and ref.startswith('#/definitions/'):
+        return schema.get('definitions', {}).get(
+            ref[len('#/definitions/'):], {})
+    return part
+
+
+def _compact_options(options, part, schema, drop_alpaca_defaults):
+    """
+    Remove empty field entries from the Alpaca options of a schema part (a
+    form, nested form, array or field), recursing into its fields and items.
+    """
+    part = _dereference(part, schema)
+    if drop_alpaca_defaults:
+        _drop_alpaca_defaults(options, part)
+    if isinstance(options.get('items'), dict):
+        items = part.get('items')
+        _compact_options(options['items'],
+                         items if isinstance(items, dict) else {}, schema,
+                         drop_alpaca_defaults)
+        if not options['items']:
+            del options['items']
+    field_options = options.get('fields')
+    if field_options is None:
+        return
+    properties = part.get('properties', {})
+    for name in list(field_options):
+        _compact_options(field_options[name], properties.get(name, {}),
+                         schema, drop_alpaca_defaults)
+        if not field_options[name]:
+            del field_options[name]
+    if not field_options:
+        del options['fields']
+
+
+def compact_output(schema, options, drop_alpaca_defaults=False):
+    """
+    Remove empty keywords (such as a blank description) from a resolved
+    schema, and empty field entries from its Alpaca options (including the
+    options of nested forms and formset rows), in place.
+
+    drop_alpaca_defaults -- also remove Alpaca options that have their
+    default value (see ALPACA_OPTION_DEFAULTS) and choice labels that are the
+    same as the choice values.
+    """
+    _compact_schema(schema)
+    _compact_options(options, schema, schema, drop_alpaca_defaults)
+    return schema, options
+
+
+PROFILES = (
+    ('default', {'compact': False}),
+    ('compact', {'compact': True}),
+    ('compact+alpaca', {'compact': True, 'drop_alpaca_defaults': True}),
+)
+
+
+def size_report(form, **kwargs):
+    """
+    Return a list of (profile, schema bytes, options bytes) for the encoded
+    conversion of form with each of the PROFILES.
+    kwargs are passed to DjangoFormToJSONSchema.
+    """
+    report = []
+    for profile, profile_kwargs in PROFILES:
+        converter_kwargs = dict(kwargs, **profile_kwargs)
+        schema, options = DjangoFormToJSONSchema(
+            **converter_kwargs).convert_to_schema(form)
+        report.append((profile, len(dumps(schema).encode('utf-8')),
+                       len(dumps(options).encode('utf-8'))))
+    return report
+
+
+# Keywords that describe a single field and are kept next to its $ref
+ANNOTATION_KEYWORDS = ('title', 'description', 'default')
+
+
+def hoist_definitions(schema, min_count=2):
+    """
+    Move field parts that are shared by at least min_count properties of
+    schema into its 'definitions' and replace them with $refs.
+
+    Parts are compared without their annotations (title, description,
+    default), which stay next to the $ref. Parts are only moved if that makes
+    the encoded schema smaller.
+    """
+    properties = schema.get('properties')
+    if not properties:
+        return schema
+    groups = OrderedDict()
+    for name, part in properties.items():
+        if '$ref' in part:
+            continue
+        body = dict((keyword, value) for keyword, value in part.items()
+                    if keyword not in ANNOTATION_KEYWORDS)
+        key = dumps(body, sort_keys=True)
+        groups.setdefault(key, (body, []))[1].append(name)
+
+    for key, (body, names) in groups.items():
+        if len(names) < min_count:
+            continue
+        definitions = schema.get('definitions', {})
+        definition_name = names[0]
+        suffix = 1
+        while definition_name in definitions:
+            suffix += 1
+            definition_name = '{}_{}'.format(names[0], suffix)
+        ref = '#/definitions/{}'.format(definition_name)
+        # Approximate encoded sizes: body per field inline, against one body
+        # plus its name in definitions and a {"$ref": ...} per field.
+        body_size = len(key)
+        ref_size = len(ref) + 12
+        if body_size * len(names) <= (body_size + len(definition_name) + 4 +
+                                      ref_size * len(names)):
+            continue
+        schema.setdefault('definitions', OrderedDict())[definition_name] = body
+        for name in names:
+            part = OrderedDict([('$ref', ref)])
+            for keyword in ANNOTATION_KEYWORDS:
+                if keyword in properties[name]:
+                    part[keyword] = properties[name][keyword]
+            properties[name] = part
+    return schema
 
 
 class DjangoFormToJSONSchema(object):
@@ -18,9 +361,56 @@ class DjangoFormToJSONSchema(object):
         2. Use it to namespace or otherwise separate a set of fields that
         belong to the same 'form' (using JS etc).
     Currently it is used in Schema's 'id' attribute.
+
+    use_cache -- keep the converted schema and options in a process wide cache
+    keyed by form class, form_key and schema_template. Forms are converted
+    once with their lazy translation strings, which are then resolved once
+    per language (see i18n for when the cache is cleared).
+    Cached results are shared so treat them as read only. A Form instance
+    is converted from scratch only if it has changed its `fields`. Forms with
+    queryset backed fields (see has_queryset_fields()) are never cached.
+    When using the cache each conversion starts from a fresh copy of the
+    schema_template. Call invalidate_cache() if a form class changes at
+    runtime.
+
+    use_definitions -- move field parts shared by several fields (e.g. the
+    same choices or constraints) to 'definitions' and reference them with
+    $ref. See hoist_definitions().
+
+    compact -- leave out empty keywords and options. Defaults to the
+    JSCHEMER_COMPACT setting. See compact_output().
+
+    drop_alpaca_defaults -- with compact, also leave out Alpaca options that
+    have their default value.
     """
 
-    def __init__(self, schema_template=None, form_key=None):
+    def __init__(self, schema_template=None, form_key=None, use_cache=False,
+                 use_definitions=False, compact=None,
+                 drop_alpaca_defaults=False):
+        self.schema_template = schema_template
+        self.form_key = form_key
+        self.use_cache = use_cache
+        self.use_definitions = use_definitions
+        if compact is None:
+            compact = get_setting('JSCHEMER_COMPACT')
+        self.compact = compact
+        self.drop_alpaca_defaults = drop_alpaca_defaults
+        # Converter whose schema holds the definitions of nested forms
+        self._root = None
+        # Reusable (slotted) schema field instances by class
+        self._schemafields = {}
+        self._template_fingerprint = None
+        if use_cache and schema_template:
+            self._template_fingerprint = schema_fingerprint(schema_template)
+        self._reset(copy_template=False)
+
+    def _reset(self, copy_template=True):
+        """
+        Set up the empty json_schema and alpaca_options to convert into.
+        """
+        schema_template = self.schema_template
+        if schema_template and copy_template:
+            schema_template = copy.deepcopy(schema_template)
         self.alpaca_options = {
             "fields": {},
             "helper": "",
@@ -35,13 +425,115 @@ class DjangoFormToJSONSchema(object):
                 'type': 'object',
                 'properties': OrderedDict(),
             }
-        if form_key:
-            self.json_schema['id'] = str(form_key)
+        if self.form_key:
+            self.json_schema['id'] = str(self.form_key)
+        # ($ref, options) of the nested forms converted so far, by class
+        self._definitions = {}
+
+    def get_cache_key(self, form):
+        """
+        Return the key the conversion of form is cached under or None if it
+        can not be cached. Forms with queryset backed fields (e.g.
+        ModelChoiceField) are not cached, so their choices stay up to date.
+        """
+        if form_fields_changed(form) or has_queryset_fields(form):
+            return None
+        form_cls = form if inspect.isclass(form) else form.__class__
+        return (form_cls, self.form_key, self._template_fingerprint,
+                self.get_output_options())
+
+    def get_output_options(self):
+        """
+        Return the options that change the conversion output, as part of the
+        cache key.
+        """
+        return (self.use_definitions, self.compact,
+                self.compact and self.drop_alpaca_defaults)
+
+    @classmethod
+    def invalidate_cache(cls, form=None):
+        """
+        Drop cached conversions of the given Form class (or instance), or all
+        of them if no form is given.
+        """
+        cache = get_schema_cache()
+        if form is None:
+            cache.clear()
+            _merge_plans.clear()
+            return
+        form_cls = form if inspect.isclass(form) else form.__class__
+        meta_options = getattr(form_cls, "SchemerOptions", None)
+        if meta_options is not None:
+            _merge_plans.pop(meta_options, None)
+        for key in cache.keys():
+            if key[0] is form_cls:
+                cache.pop(key)
 
     def convert_to_schema(self, form):
         """
         Converts the Form to a JSON Schema object and Alpaca options
         """
+        if not signals.schema_converted.receivers:
+            return self._get_schema(form)[0]
+        start = time.perf_counter()
+        result, cache_hit = self._get_schema(form)
+        signals.schema_converted.send(
+            sender=self.__class__, form=form,
+            duration=time.perf_counter() - start,
+            field_count=len(result[0].get('properties', ())),
+            cache_hit=cache_hit)
+        return result
+
+    def _get_schema(self, form):
+        """
+        Return ((schema, options), cache_hit) where cache_hit is None if the
+        cache is not used.
+        """
+        if not self.use_cache:
+            return self._resolve(self._convert_to_schema(form)), None
+
+        cache_key = self.get_cache_key(form)
+        if cache_key is None:
+            self._reset()
+            result = self._resolve(self._convert_to_schema(form))
+            cache_hit = False
+        else:
+            result, cache_hit = self._get_cached(
+                cache_key, lambda: self._convert_to_schema(form))
+        self.json_schema, self.alpaca_options = result
+        return result, cache_hit
+
+    def _resolve(self, result):
+        """
+        Return a copy of a (schema, options) conversion with lazy translation
+        strings resolved in the active language (and compacted).
+        """
+        schema, options = resolve_promises(result[0]), resolve_promises(result[1])
+        if self.compact:
+            compact_output(schema, options, self.drop_alpaca_defaults)
+        return schema, options
+
+    def _get_cached(self, cache_key, convert):
+        """
+        Return (result, cache_hit) for the active language. The language
+        neutral output of convert() is cached under cache_key and its
+        resolved copy under cache_key + (language,).
+        """
+        cache = get_schema_cache()
+        resolved_key = cache_key + (get_language(),)
+        result = cache.get(resolved_key)
+        if result is not None:
+            return result, True
+        converted = cache.get(cache_key)
+        if converted is None:
+            self._reset()
+            converted = convert()
+            cache.set(cache_key, converted)
+        result = self._resolve(converted)
+        cache.set(resolved_key, result)
+        return result, False
+
+    def _convert_to_schema(self, form):
 
         fields = form.base_fields
         # If a Form instance is given, use the 'fields' attribute if it exists
@@ -56,23 +548,175 @@ class DjangoFormToJSONSchema(object):
             self.alpaca_options['fields'][name] = options
             if field.required:
                 required_fields.append(name)
+        meta_options = getattr(form, "SchemerOptions", None)
+        for name, nested in getattr(meta_options, "nested", {}).items():
+            if not isinstance(nested, Nested):
+                nested = Nested(nested)
+            part, options = self.convert_nested(nested, name)
+            self.json_schema['properties'][name] = part
+            self.alpaca_options['fields'][name] = options
+            if nested.required:
+                required_fields.append(name)
         # if we have required fields, add them to the Schema
         if required_fields:
             self.json_schema['required'] = required_fields
 
+        return self._finish(form)
+
+    def convert_nested(self, nested, name):
+        """
+        Converts a nested Form or FormSet class, or its Nested declaration
+        (see SchemerOptions.nested), to a (part, options) tuple. The row form
+        is converted once per conversion into the root schema's definitions
+        and referenced with $ref wherever it is used. Nested formsets become
+        arrays like in convert_formset().
+        """
+        if not isinstance(nested, Nested):
+            nested = Nested(nested)
+        form_cls = nested.form
+        if issubclass(form_cls, BaseFormSet):
+            ref, options = self.get_definition(form_cls.form,
+                                               formset=form_cls)
+            part = OrderedDict([('type', 'array'),
+                                ('items', OrderedDict([('$ref', ref)]))])
+            self._set_formset_bounds(part, form_cls)
+            options = {'type': 'array', 'items': options}
+        else:
+            ref, options = self.get_definition(form_cls)
+            part = OrderedDict([('$ref', ref)])
+        part['title'] = nested.label or name.replace('_', ' ').capitalize()
+        return part, options
+
+    def get_definition(self, form_cls, formset=None):
+        """
+        Convert form_cls into the definitions of the root schema, unless it
+        was already, and return its ($ref, options).
+
+        formset -- the FormSet class form_cls is the row form of. Its rows
+        get the ORDER and DELETE fields of the formset, in a definition of
+        their own.
+        """
+        root = self._root or self
+        row_fields = self.get_row_fields(formset) if formset else []
+        key = form_cls
+        if row_fields:
+            key = (form_cls, tuple(name for name, field in row_fields))
+        definition = root._definitions.get(key)
+        if definition is not None:
+            return definition
+        definitions = root.json_schema.setdefault('definitions', OrderedDict())
+        name = form_cls.__name__
+        suffix = 1
+        while name in definitions:
+            suffix += 1
+            name = '{}_{}'.format(form_cls.__name__, suffix)
+        converter = self.__class__()
+        converter._root = root
+        converter._reset()
+        # The definition is registered before converting form_cls, which
+        # fills it in place, so that forms nesting it (or itself) reuse it.
+        definitions[name] = converter.json_schema
+        definition = ('#/definitions/{}'.format(name), converter.alpaca_options)
+        root._definitions[key] = definition
+        converter._convert_to_schema(form_cls)
+        converter._add_row_fields(converter.json_schema,
+                                  converter.alpaca_options, row_fields)
+        return definition
+
+    def _finish(self, form):
+        """
+        Apply the SchemerOptions of form (a Form or Model) and the output
+        options to the converted schema and return (schema, options).
+        """
         # Check the form for inner 'AlpacaOptions' class and update
         # dictionaries with any supplied options/schema.
         meta_options = getattr(form, "SchemerOptions", None)
         if meta_options:
-            # We need merger because nested dicts don't update() automatically
-            # and need to recurse. deepmerge module handles that for us.
-            merger = Merger([(dict, ["merge"])], ["override"], ["override"])
-            self.alpaca_options = merger.merge(self.alpaca_options,
-                                               getattr(meta_options, "options", {}))
-            self.json_schema = merger.merge(self.json_schema,
-                                            getattr(meta_options, "schema", {}))
+            # Nested dicts don't update() automatically and need to recurse,
+            # so apply the precomputed leaf overrides of each of them.
+            options_plan, schema_plan = get_merge_plans(meta_options)
+            apply_merge_plan(self.alpaca_options, options_plan)
+            apply_merge_plan(self.json_schema, schema_plan)
+        if self.use_definitions:
+            hoist_definitions(self.json_schema)
         return self.json_schema, self.alpaca_options
 
+    def get_row_converter(self):
+        """
+        Return the converter for the rows of formsets.
+        """
+        return self.__class__(use_cache=self.use_cache,
+                              use_definitions=self.use_definitions,
+                              compact=self.compact,
+                              drop_alpaca_defaults=self.drop_alpaca_defaults)
+
+    def convert_formset(self, formset):
+        """
+        Converts a FormSet class (or instance) to an array JSON Schema whose
+        items are its rows, and Alpaca options.
+
+        The row form is converted once (and cached like any form with
+        use_cache), whatever the number of rows. min_num and max_num become
+        minItems and maxItems when validate_min and validate_max are set;
+        otherwise maxItems is the formset's absolute_max. Rows get the ORDER
+        and DELETE fields of formsets with can_order and can_delete.
+        Validating a document against the schema validates all its rows.
+        """
+        row_schema, row_options = self.get_row_converter().convert_to_schema(
+            formset.form)
+
+        row_fields = self.get_row_fields(formset)
+        if row_fields:
+            # the row conversion may be cached, so add to copies
+            row_schema = dict(row_schema, properties=OrderedDict(
+                row_schema.get('properties', ())))
+            row_options = dict(row_options,
+                               fields=dict(row_options.get('fields', ())))
+            self._add_row_fields(row_schema, row_options, row_fields)
+
+        schema = OrderedDict([('type', 'array'), ('items', row_schema)])
+        if self.form_key:
+            schema['id'] = str(self.form_key)
+        self._set_formset_bounds(schema, formset)
+        options = {'type': 'array', 'items': row_options}
+        return schema, options
+
+    def get_row_fields(self, formset):
+        """
+        Return the (name, field) pairs formset adds to each of its rows: the
+        ORDER and DELETE fields of formsets with can_order and can_delete.
+        """
+        row_fields = []
+        if formset.can_order:
+            row_fields.append(('ORDER', forms.IntegerField(
+                label=_('Order'), required=False)))
+        if formset.can_delete:
+            row_fields.append(('DELETE', forms.BooleanField(
+                label=_('Delete'), required=False)))
+        return row_fields
+
+    def _add_row_fields(self, row_schema, row_options, row_fields):
+        """
+        Add the converted row_fields (see get_row_fields()) to a row schema
+        and its options, in place.
+        """
+        for name, field in row_fields:
+            part, options = self._resolve(self.convert_formfield(field, name))
+            row_schema['properties'][name] = part
+            if options or not self.compact:
+                row_options['fields'][name] = options
+
+    def _set_formset_bounds(self, schema, formset):
+        """
+        Set minItems and maxItems of an array schema from formset.
+        """
+        if formset.validate_min and formset.min_num:
+            schema['minItems'] = formset.min_num
+        if formset.validate_max:
+            schema['maxItems'] = formset.max_num
+        elif getattr(formset, 'absolute_max', None) is not None:
+            schema['maxItems'] = formset.absolute_max
+
     input_type_map = {
         'text': 'string',
     }
@@ -84,21 +728,214 @@ class DjangoFormToJSONSchema(object):
         dictionary part.
         extra_options -- extra Alpaca options to be applied to this field.
         """
+        if not signals.field_converted.receivers:
+            return self._convert_formfield(field, name, extra_options)
+        start = time.perf_counter()
+        result = self._convert_formfield(field, name, extra_options)
+        signals.field_converted.send(sender=self.__class__, field=field,
+                                     name=name,
+                                     duration=time.perf_counter() - start)
+        return result
+
+    def get_schemafield(self, schemafield_cls, field, name):
+        """
+        Return a schemafield_cls instance bound to field. Instances without a
+        __dict__ (only __slots__) are reused across fields, unless they
+        assigned field attributes when they were created.
+        """
+        schemafield = self._schemafields.get(schemafield_cls)
+        if schemafield is not None:
+            return schemafield.bind(field, name)
+        schemafield = schemafield_cls(field, name)
+        if (not hasattr(schemafield, '__dict__') and
+                not getattr(schemafield, '_overrides', None)):
+            self._schemafields[schemafield_cls] = schemafield
+        return schemafield
+
+    def _convert_formfield(self, field, name, extra_options=None):
 
         # We do not check for exceptions here.
         # should we let them propagate or should we have a sensible default?
         schemafield_cls = field_registry.get_schemafield(field)
-        schemafield = schemafield_cls(field, name)
+        schemafield = self.get_schemafield(schemafield_cls, field, name)
 
-        part = schemafield.get_schema_part()
+        part = schemafield.get_schema_part(lazy=True)
         options = schemafield.get_alpaca_options()
         if extra_options:
             options.update(extra_options)
         return part, options
 
 
+_AUTO_FIELDS = tuple(getattr(models, name) for name in
+                     ('AutoField', 'BigAutoField', 'SmallAutoField')
+                     if hasattr(models, name))
+
+
 class DjangoModelToJSONSchema(DjangoFormToJSONSchema):
-    def convert_model(self, model, json_schema=None):
-        model_form = None   # TODO convert to model form
-        # TODO handle many2many and inlines
-        return self.convert_form(model_form, json_schema)
+    """
+    Converts a Model to a JSON schema, reading its fields from Model._meta
+    (no ModelForm is built).
+
+    Like a ModelForm it includes the editable concrete and many to many
+    fields, and fields with blank=False are required. Fields with null=True
+    also accept null. Foreign keys are typed after the field they point to
+    and many to many fields are arrays of those. Fields of classes missing
+    from model_field_types (e.g. JSONField) accept any value. Choices of
+    relations are not inlined, but if a choice source is registered for the
+    related model (see choices.choice_sources) its URL is used as Alpaca
+    dataSource.
+
+    Conversions are always cached per model class and field selection, and
+    resolved once per language. Call invalidate_cache(model) if a model
+    changes at runtime.
+    """
+
+    # Model field class -> (type, format). Subclasses are resolved through
+    # their MRO, so add entries here to support custom fields.
+    model_field_types = {
+        models.BooleanField: ('boolean', None),
+        models.CharField: ('string', None),
+        models.TextField: ('string', None),
+        models.EmailField: ('string', 'email'),
+        models.URLField: ('string', 'uri'),
+        models.UUIDField: ('string', None),
+        models.SlugField: ('string', None),
+        models.FilePathField: ('string', None),
+        models.FileField: ('string', None),
+        models.DurationField: ('string', None),
+        models.DateField: ('string', 'date'),
+        models.DateTimeField: ('string', 'datetime'),
+        models.TimeField: ('string', 'time'),
+        models.IntegerField: ('integer', None),
+        models.DecimalField: ('number', None),
+        models.FloatField: ('number', None),
+        models.GenericIPAddressField: ('string', 'ipv4'),
+    }
+
+    def convert_model(self, model, fields=None, exclude=None):
+        """
+        Converts a Model class (or instance) to a JSON Schema object and
+        Alpaca options.
+
+        fields -- optionally the names of the fields to include.
+        exclude -- optionally the names of fields to leave out.
+        """
+        if not inspect.isclass(model):
+            model = model.__class__
+        if not signals.schema_converted.receivers:
+            return self._get_model_schema(model, fields, exclude)[0]
+        start = time.perf_counter()
+        result, cache_hit = self._get_model_schema(model, fields, exclude)
+        signals.schema_converted.send(
+            sender=self.__class__, form=model,
+            duration=time.perf_counter() - start,
+            field_count=len(result[0].get('properties', ())),
+            cache_hit=cache_hit)
+        return result
+
+    def _get_model_schema(self, model, fields, exclude):
+        if self.schema_template and self._template_fingerprint is None:
+            self._template_fingerprint = schema_fingerprint(self.schema_template)
+        cache_key = (model, self.form_key, self._template_fingerprint,
+                     self.get_output_options(),
+                     tuple(fields) if fields is not None else None,
+                     tuple(exclude or ()))
+        result, cache_hit = self._get_cached(
+            cache_key, lambda: self._convert_model(model, fields, exclude))
+        self.json_schema, self.alpaca_options = result
+        return result, cache_hit
+
+    def _convert_model(self, model, fields, exclude):
+        opts = model._meta
+        required_fields = []
+        for field in sorted(chain(opts.concrete_fields, opts.many_to_many)):
+            if (not field.editable or field.auto_created or
+                    isinstance(field, _AUTO_FIELDS)):
+                continue
+            if fields is not None and field.name not in fields:
+                continue
+            if exclude and field.name in exclude:
+                continue
+            part, options = self.convert_modelfield(field)
+            self.json_schema['properties'][field.name] = part
+            self.alpaca_options['fields'][field.name] = options
+            if not field.blank:
+                required_fields.append(field.name)
+        if required_fields:
+            self.json_schema['required'] = required_fields
+        return self._finish(model)
+
+    def get_modelfield_type(self, field):
+        """
+        Return the (type, format) of a model field. Fields of unknown classes
+        fall back to the class named by their get_internal_type(), or to
+        (None, None) for an untyped schema.
+        """
+        for cls in chain(inspect.getmro(field.__class__),
+                         [getattr(models, field.get_internal_type(), None)]):
+            if cls in self.model_field_types:
+                return self.model_field_types[cls]
+        return None, None
+
+    def convert_modelfield(self, field):
+        """
+        Converts a model field to a (part,options) tuple where
+        part is the JSON Schema part and options is the Alpaca Options
+        dictionary part.
+        """
+        if not signals.field_converted.receivers:
+            return self._convert_modelfield(field)
+        start = time.perf_counter()
+        result = self._convert_modelfield(field)
+        signals.field_converted.send(sender=self.__class__, field=field,
+                                     name=field.name,
+                                     duration=time.perf_counter() - start)
+        return result
+
+    def _convert_modelfield(self, field):
+        # Relations are typed after the field holding their value
+        value_field = field
+        while value_field.is_relation:
+            if value_field.many_to_many:
+                value_field = value_field.related_model._meta.pk
+            else:
+                value_field = value_field.target_field
+        field_type, field_format = self.get_modelfield_type(value_field)
+
+        value_part = {}
+        if field_type is not None:
+            value_part['type'] = field_type
+            if field.null and not field.many_to_many:
+                value_part['type'] = [field_type, 'null']
+        if field_format:
+            value_part['format'] = field_format
+        part = {
+            'title': capfirst(field.verbose_name),
+            'description': field.help_text,
+        }
+        if field.many_to_many:
+            part.update(type='array', items=value_part, uniqueItems=True)
+        else:
+            part.update(value_part)
+
+        options = {}
+        if field.is_relation:
+            to_field = None if field.many_to_many else field.to_fields[0]
+            source = choice_sources.get_for_model(field.related_model, to_field)
+            if source is not None:
+                options['type'] = 'select'
+                options['dataSource'] = source.get_url()
+            return part, options
+
+        if field_type == 'string' and field.max_length:
+            part['maxLength'] = field.max_length
+        if field.choices:
+            choices = list(field.flatchoices)
+            if field.null and None not in (choice[0] for choice in choices):
+                choices.append((None, ''))
+            part['enum'] = [choice[0] for choice in choices]
+            options['type'] = 'select'
+            options['optionLabels'] = [choice[1] for choice in choices]
+        if field.has_default() and not callable(field.default):
+            part['default'] = field.default
+        return part, options
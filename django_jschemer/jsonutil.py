@@ -1,7 +1,25 @@
+import hashlib
+import json
+import math
+from collections import OrderedDict
+
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.functional import Promise
 from django.utils.encoding import force_text
 from django.core.serializers.json import DjangoJSONEncoder
 
+from django_jschemer.conf import get_setting
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
 # Encoder copies from:
 # https://docs.djangoproject.com/en/1.11/topics/serialization/#serialization-formats-json
 
@@ -15,3 +33,108 @@ class LazyEncoder(DjangoJSONEncoder):
             return force_text(obj)
         return super(LazyEncoder,
                      self).default(obj)
+
+
+def resolve_promises(obj):
+    """
+    Return a copy of obj (made of dicts, lists and tuples) with lazy
+    translation strings forced to str, so that it can be encoded without a
+    default() hook per string. OrderedDicts stay ordered.
+    """
+    if isinstance(obj, dict):
+        mapping = OrderedDict if isinstance(obj, OrderedDict) else dict
+        return mapping((force_text(key) if isinstance(key, Promise) else key,
+                     resolve_promises(value)) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return [resolve_promises(value) for value in obj]
+    if isinstance(obj, Promise):
+        return force_text(obj)
+    return obj
+
+
+# Handles what remains after resolve_promises() (dates, decimals etc)
+_default = DjangoJSONEncoder().default
+
+
+def _dumps_json(obj, sort_keys):
+    return json.dumps(obj, cls=DjangoJSONEncoder, sort_keys=sort_keys,
+                      separators=(',', ':'), ensure_ascii=False)
+
+
+def _has_non_finite(obj):
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        obj = obj.values()
+    elif not isinstance(obj, (list, tuple)):
+        return False
+    return any(_has_non_finite(value) for value in obj)
+
+
+def _dumps_orjson(obj, sort_keys):
+    # Dates and times go through DjangoJSONEncoder, like with json
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    try:
+        encoded = orjson.dumps(obj, default=_default, option=option)
+    except TypeError:
+        # e.g. integers beyond 64 bits, or keys json accepts and orjson not
+        return _dumps_json(obj, sort_keys)
+    # orjson encodes NaN and Infinity as null
+    if b'null' in encoded and _has_non_finite(obj):
+        return _dumps_json(obj, sort_keys)
+    return encoded.decode('utf-8')
+
+
+def _dumps_ujson(obj, sort_keys):
+    return ujson.dumps(obj, default=_default, sort_keys=sort_keys,
+                       ensure_ascii=False, escape_forward_slashes=False)
+
+
+# name -> (encode function, available)
+BACKENDS = {
+    'orjson': (_dumps_orjson, orjson is not None),
+    'ujson': (_dumps_ujson, ujson is not None),
+    'json': (_dumps_json, True),
+}
+
+# Tried in order when JSCHEMER_JSON_BACKEND is None
+BACKEND_PREFERENCE = ('orjson', 'ujson', 'json')
+
+
+def get_backend():
+    """
+    Return the name of the JSON encoding backend in use.
+    """
+    name = get_setting('JSCHEMER_JSON_BACKEND')
+    if name is None:
+        for name in BACKEND_PREFERENCE:
+            if BACKENDS[name][1]:
+                return name
+    if name not in BACKENDS:
+        raise ImproperlyConfigured(
+            "Unknown JSCHEMER_JSON_BACKEND {!r}".format(name))
+    if not BACKENDS[name][1]:
+        raise ImproperlyConfigured(
+            "JSCHEMER_JSON_BACKEND {!r} is not installed".format(name))
+    return name
+
+
+def dumps(obj, sort_keys=False):
+    """
+    Encode obj as compact JSON (without escaping non ASCII characters) with
+    the configured backend. Lazy translation strings are resolved first.
+    The output of every backend is the same as json.dumps() with
+    DjangoJSONEncoder.
+    """
+    return BACKENDS[get_backend()][0](resolve_promises(obj), sort_keys)
+
+
+def schema_fingerprint(schema):
+    """
+    Return a stable hex digest that identifies a schema.
+    Two schemas that differ only in key order have the same fingerprint.
+    """
+    encoded = dumps(schema, sort_keys=True)
+    return hashlib.sha1(encoded.encode('utf-8')).hexdigest()
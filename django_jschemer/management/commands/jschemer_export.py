@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from django_jschemer.conf import get_setting
+from django_jschemer.export import export_forms, form_registry
+
+
+class Command(BaseCommand):
+    help = ("Convert the exported forms to minified, content hashed JSON "
+            "Schema and Alpaca options files and write a manifest.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o',
+                            help='Output directory (default: JSCHEMER_EXPORT_DIR).')
+        parser.add_argument('--language', '-l', action='append', dest='languages',
+                            help='Language to export. Can be repeated '
+                                 '(default: JSCHEMER_EXPORT_LANGUAGES).')
+        parser.add_argument('form_keys', nargs='*',
+                            help='Only export these form keys.')
+
+    def handle(self, *args, **options):
+        output_dir = options['output'] or get_setting('JSCHEMER_EXPORT_DIR')
+        if not output_dir:
+            raise CommandError("No output directory. Use --output or set "
+                               "JSCHEMER_EXPORT_DIR.")
+        forms = form_registry.get_forms()
+        if options['form_keys']:
+            unknown = set(options['form_keys']) - set(forms)
+            if unknown:
+                raise CommandError("Unknown form keys: {}".format(
+                    ', '.join(sorted(unknown))))
+            forms = dict((key, forms[key]) for key in options['form_keys'])
+
+        manifest = export_forms(output_dir, languages=options['languages'],
+                                forms=forms)
+        for form_key, languages in sorted(manifest['forms'].items()):
+            for language, entry in sorted(languages.items()):
+                self.stdout.write("{} ({}): schema {} bytes, options {} bytes".format(
+                    form_key, language, entry['schema_size'],
+                    entry['options_size']))
+        self.stdout.write("Exported {} forms to {}".format(
+            len(manifest['forms']), output_dir))
@@ -11,6 +11,9 @@ class JSONSchemaFieldRegistry(object):
 
     def __init__(self):
         self._registry = {}
+        # Resolved Schema Field per Django Field class (including subclasses
+        # of registered classes). Cleared by register() and unregister().
+        self._resolved = {}
 
     def register(self, form_field_cls, jsonschema_field_cls):
         """
@@ -35,6 +38,7 @@ class JSONSchemaFieldRegistry(object):
             raise ValueError("Already registered")
 
         self._registry[form_field_cls] = jsonschema_field_cls
+        self._resolved.clear()
 
     def unregister(self, form_field_cls):
         """
@@ -46,29 +50,44 @@ class JSONSchemaFieldRegistry(object):
         if form_field_cls not in self._registry:
             raise ValueError("class {} is Not registered".format(form_field_cls))
         del self._registry[form_field_cls]
+        self._resolved.clear()
+
+    def resolve(self, form_field_cls):
+        """
+        Return the Schema Field registered for form_field_cls or, if there is
+        none, for the closest registered class in its MRO.
+        Returns None if nothing in the MRO is registered.
+        Results are cached per class.
+        """
+        try:
+            return self._resolved[form_field_cls]
+        except KeyError:
+            pass
+        schemafield_cls = None
+        for klass in inspect.getmro(form_field_cls):
+            if klass in self._registry:
+                schemafield_cls = self._registry[klass]
+                break
+        self._resolved[form_field_cls] = schemafield_cls
+        return schemafield_cls
 
     def get_schemafield(self, form_field):
         """
         Searches registry for the given Django Form field and returns the
         associated Schema Field if found.
-        Returns None otherwise
 
-        It will search by class object which is the natural key but if passed,
-        an instance object it will iterate over the registry keys trying to
-        match them.
+        Accepts a Field class or instance. Subclasses of registered Fields
+        resolve to the Schema Field of their closest registered ancestor.
+        For a class, returns None if nothing matches. For an instance, raises
+        KeyError since the field cannot be converted.
         """
         if inspect.isclass(form_field):
-            return self._registry.get(form_field, None)
-        if isinstance(form_field, fields.Field):
-            instance_name = form_field.__class__.__name__
-            for key, value in self._registry.items():
-                # This feels like a hack. I don't think there is a better way.
-                # isinstance() will not work because all key are subclasses of
-                # Field.
-                key_name = key.__name__
-                if key_name == instance_name:
-                    return value
-        raise KeyError("Unsupported field: {}".format(instance_name))
+            return self.resolve(form_field)
+        schemafield_cls = self.resolve(form_field.__class__)
+        if schemafield_cls is None:
+            raise KeyError("Unsupported field: {}".format(
+                form_field.__class__.__name__))
+        return schemafield_cls
 
 
 field_registry = JSONSchemaFieldRegistry()
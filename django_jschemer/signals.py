@@ -0,0 +1,28 @@
+"""
+Signals reporting the cost of schema generation, validation and encoding.
+
+They are only sent (and durations only measured) while at least one receiver
+is connected, so leaving them unused costs next to nothing. All durations are
+in seconds.
+"""
+from django.dispatch import Signal
+
+# Sent by DjangoFormToJSONSchema.convert_to_schema().
+# kwargs: form, duration, field_count, cache_hit (None if caching is off)
+schema_converted = Signal()
+
+# Sent by DjangoFormToJSONSchema.convert_formfield().
+# kwargs: field, name, duration
+field_converted = Signal()
+
+# Sent by SchemaValidator after validating a value.
+# kwargs: validator, duration, payload_size, valid, error_count
+validation_finished = Signal()
+
+# Sent after a schema or options object is encoded to JSON.
+# kwargs: duration, size
+json_encoded = Signal()
+
+# Sent by every lookup in one of django-jschemer's caches.
+# kwargs: cache (the cache name), hit
+cache_accessed = Signal()
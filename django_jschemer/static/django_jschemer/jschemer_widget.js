@@ -8,30 +8,136 @@ $(document).ready(function(){
         }
     }
 
+    // One request per schema URL, shared by all widgets using it
+    var jschemer_schema_requests = {};
+
+    function jschemer_fetch_schema(url){
+        if(!jschemer_schema_requests[url]){
+            jschemer_schema_requests[url] = $.getJSON(url).fail(function(){
+                // Let the next attempt request it again
+                delete jschemer_schema_requests[url];
+            });
+        }
+        return jschemer_schema_requests[url];
+    }
+
+    // Shown in place of a widget whose schema could not be fetched, with a
+    // button to try again
+    function jschemer_render_error(element, container, url, status, error){
+        if(window.console){
+            console.error("jschemer: could not load " + url + ": " + status, error);
+        }
+        element.data("jschemer-rendered", false);
+        var retry = $('<button type="button" class="jschemer-retry">Retry</button>');
+        container.empty().append(
+            $('<p class="jschemer-error"></p>').text("The form could not be loaded. "),
+            retry);
+        retry.one("click", function(){
+            container.empty();
+            jschemer_render_widget(element, container);
+        });
+    }
+
+    // Parsed schema and options by data-fieldkey, shared by all widgets
+    // using the same key (and the same encoded attributes)
+    var jschemer_parsed_schemas = {};
+
+    function jschemer_parse_schema(element){
+        var schema_str = element.attr("data-schemajson");
+        var option_str = element.attr("data-alpacaoptions") || "";
+        var key = element.attr("data-fieldkey");
+        var parsed = key ? jschemer_parsed_schemas[key] : null;
+        if(parsed && parsed.schema_str === schema_str && parsed.option_str === option_str){
+            return parsed;
+        }
+        parsed = {
+            "schema_str": schema_str,
+            "option_str": option_str,
+            "schema": JSON.parse(schema_str), // TODO check for errors
+            "options": option_str ? JSON.parse(option_str) : {},
+        };
+        if(key){
+            jschemer_parsed_schemas[key] = parsed;
+        }
+        return parsed;
+    }
+
+    function jschemer_render_alpaca(element, container, schema, options){
+        container.alpaca( {
+            "schema":schema,
+            "options":options,
+            "postRender":jschemer_get_postRender_funcion(element),
+        });
+    }
+
+    function jschemer_render_widget(element, container){
+        if(element.data("jschemer-rendered")){
+            return;
+        }
+        element.data("jschemer-rendered", true);
+        container.removeAttr("tabindex").css("min-height", "");
+        var schema_url = element.attr("data-schemaurl");
+        if(schema_url){
+            // Schema and options are served by django_jschemer.views.schema_view
+            jschemer_fetch_schema(schema_url).done(function(data){
+                jschemer_render_alpaca(element, container, data.schema, data.options || {});
+            }).fail(function(xhr, status, error){
+                jschemer_render_error(element, container, schema_url, status, error);
+            });
+            return;
+        }
+        var parsed = jschemer_parse_schema(element);
+        jschemer_render_alpaca(element, container, parsed.schema, parsed.options);
+    }
+
+    // Widgets are rendered when their placeholder comes near the viewport
+    // (hidden ones, e.g. in collapsed tabs, once they are shown) or gets the
+    // focus. Widgets that are never rendered keep the value of their hidden
+    // field on submit.
+    var jschemer_observer = null;
+    if(window.IntersectionObserver){
+        jschemer_observer = new IntersectionObserver(function(entries){
+            for(var i=0;i<entries.length;i++){
+                if(entries[i].isIntersecting){
+                    jschemer_observer.unobserve(entries[i].target);
+                    $(entries[i].target).trigger("jschemer:render");
+                }
+            }
+        }, {"rootMargin": "200px"});
+    }
+
+    // Height of a placeholder until its widget is rendered. Empty ones would
+    // all sit at the same position and come into view together.
+    var jschemer_placeholder_height = "150px";
+
+    function jschemer_initialize_widget(element){
+        var innerDivId = "alpacaform_"+element.attr('id');
+        element.after('<div id="'+innerDivId+'"></div>');
+        var container = $("#"+innerDivId);
+        if(!jschemer_observer){
+            // No IntersectionObserver support, render right away
+            jschemer_render_widget(element, container);
+            return;
+        }
+        container.attr("tabindex", "0").css("min-height", jschemer_placeholder_height);
+        container.one("jschemer:render focusin", function(){
+            jschemer_observer.unobserve(container[0]);
+            jschemer_render_widget(element, container);
+        });
+        jschemer_observer.observe(container[0]);
+    }
+
     function jschemer_initialize_alpaca_for_widgets(){
         window.controls = {}; // All controls associated with hidden form ID as key
         $.alpaca.setDefaultLocale("el_GR");
         var elements = $('[data-alpaca="true"]');
         for(var i=0;i<elements.length;i++){
-
-            var element = $(elements[i]);
-            var schema = JSON.parse( element.attr("data-schemajson")); // TODO check for errors
-            var option_str = element.attr("data-alpacaoptions");
-            if(!option_str){
-                var options = {};
-            }
-            else{
-                var options = JSON.parse(option_str);
-            }
-
-            var innerDivId = "alpacaform_"+element.attr('id');
-            element.after('<div id="'+innerDivId+'"</div>');
-            $("#"+innerDivId).alpaca( {
-                "schema":schema,
-                "options":options,
-                "postRender":jschemer_get_postRender_funcion(element),
-            });
+            jschemer_initialize_widget($(elements[i]));
         }
+        // Render a widget now, whether it is visible or not
+        $.jschemer_render_widget = function(element){
+            $("#alpacaform_"+$(element).attr('id')).trigger("jschemer:render");
+        };
         var jschemer_serialize_controls_to_hidden_fields = function(){
             for(key in window.controls){
                 var control = window.controls[key];
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from django.core.exceptions import ValidationError
+from django.test.utils import override_settings
+
+from django_jschemer.aio import validate_async
+from django_jschemer.forms import JSONSchemaField, SchemaValidator
+from .test_validation import SCHEMA
+
+
+class SlowValidator(object):
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, value):
+        with self.lock:
+            self.calls.append(value)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+
+
+class AsyncValidationTestCase(unittest.TestCase):
+
+    def test_acall(self):
+        validator = SchemaValidator(SCHEMA, collect_errors=True)
+
+        async def validate():
+            self.assertEqual(await validator.acall('{"name": "John"}'),
+                             '{"name": "John"}')
+            with self.assertRaises(ValidationError) as context:
+                await validator.acall('{"name": 1, "email": 2}')
+            return context.exception
+
+        error = asyncio.run(validate())
+        with self.assertRaises(ValidationError) as context:
+            validator('{"name": 1, "email": 2}')
+        self.assertEqual(sorted(error.messages),
+                         sorted(context.exception.messages))
+        self.assertTrue(all(e.code == 'schema' for e in error.error_list))
+
+    def test_process_executor(self):
+        validator = SchemaValidator(SCHEMA)
+
+        async def validate():
+            await validator.acall('{"name": "John"}', executor='process')
+            with self.assertRaisesRegex(ValidationError, "too long"):
+                await validator.acall('{"name": "A name that is too long"}',
+                                      executor='process')
+
+        asyncio.run(validate())
+
+    def test_aclean(self):
+        field = JSONSchemaField(schema=SCHEMA, max_length=30)
+
+        async def clean():
+            self.assertEqual(await field.aclean('{"name": "John"}'),
+                             '{"name": "John"}')
+            with self.assertRaises(ValidationError) as context:
+                await field.aclean('{"name": "A name that is too long"}')
+            return context.exception
+
+        error = asyncio.run(clean())
+        # max_length and the schema both fail
+        self.assertEqual(len(error.messages), 2)
+        with self.assertRaises(ValidationError):
+            asyncio.run(field.aclean(''))
+
+    def test_event_loop_is_not_blocked(self):
+        validator = SlowValidator(delay=0.2)
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            ticker = asyncio.ensure_future(tick())
+            await validate_async(validator, 'value')
+            ticker.cancel()
+
+        asyncio.run(run())
+        self.assertTrue(len(ticks) > 5)
+
+    def test_concurrency_limit_and_cancellation(self):
+        validator = SlowValidator()
+
+        async def run():
+            tasks = [asyncio.ensure_future(validate_async(validator, i))
+                     for i in range(4)]
+            await asyncio.sleep(0.01)
+            tasks[-1].cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            return results
+
+        with override_settings(JSCHEMER_ASYNC_CONCURRENCY=2):
+            results = asyncio.run(run())
+        self.assertEqual(results[:3], [0, 1, 2])
+        self.assertIsInstance(results[3], asyncio.CancelledError)
+        self.assertEqual(validator.max_running, 2)
+        self.assertEqual(sorted(validator.calls), [0, 1, 2])
+
+    def test_timeout(self):
+        with self.assertRaises(ValidationError) as context:
+            asyncio.run(validate_async(SlowValidator(delay=0.2), 'value',
+                                       timeout=0.01))
+        self.assertEqual(context.exception.code, 'timeout')
+
+    def test_timeout_keeps_slot(self):
+        validator = SlowValidator(delay=0.1)
+
+        async def run():
+            with self.assertRaises(ValidationError):
+                await validate_async(validator, 0, timeout=0.01)
+            await validate_async(validator, 1)
+
+        with override_settings(JSCHEMER_ASYNC_CONCURRENCY=1):
+            asyncio.run(run())
+        self.assertEqual(validator.calls, [0, 1])
+        self.assertEqual(validator.max_running, 1)
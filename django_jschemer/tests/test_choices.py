@@ -0,0 +1,200 @@
+import json
+from unittest import mock
+
+from django import forms
+from django.contrib.auth.models import Group
+from django.db.models.functions import Upper
+from django.http import Http404
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+from django_jschemer.choices import choice_sources, set_choice_label
+from django_jschemer.jsonschema import DjangoFormToJSONSchema
+from django_jschemer.views import choices_view
+
+
+class GroupForm(forms.Form):
+    group = forms.ModelChoiceField(queryset=Group.objects.all())
+
+
+class InlineChoicesTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Group.objects.bulk_create(
+            [Group(name='group %02d' % i) for i in range(3)])
+
+    def convert(self, form):
+        with self.assertNumQueries(1):
+            schema, options = DjangoFormToJSONSchema().convert_to_schema(form)
+        return (schema['properties']['group']['enum'],
+                options['fields']['group']['optionLabels'])
+
+    def test_single_query(self):
+        enum, labels = self.convert(GroupForm())
+        pks = list(Group.objects.order_by('pk').values_list('pk', flat=True))
+        self.assertEqual(enum, [""] + pks)
+        self.assertEqual(labels[1:], ['group 00', 'group 01', 'group 02'])
+
+    def test_multiple(self):
+        class GroupsForm(forms.Form):
+            groups = forms.ModelMultipleChoiceField(
+                queryset=Group.objects.all())
+
+        with self.assertNumQueries(1):
+            schema, options = DjangoFormToJSONSchema().convert_to_schema(
+                GroupsForm())
+        pks = list(Group.objects.order_by('pk').values_list('pk', flat=True))
+        part = schema['properties']['groups']
+        self.assertEqual(part['type'], 'array')
+        self.assertEqual(part['items'], {'type': 'number', 'enum': pks})
+        self.assertTrue(options['fields']['groups']['multiple'])
+        self.assertEqual(options['fields']['groups']['optionLabels'],
+                         ['group 00', 'group 01', 'group 02'])
+
+    def test_not_cached(self):
+        converter = DjangoFormToJSONSchema(use_cache=True)
+        enum = converter.convert_to_schema(GroupForm)[0]['properties'][
+            'group']['enum']
+        group = Group.objects.create(name='new group')
+        schema, options = converter.convert_to_schema(GroupForm)
+        self.assertEqual(schema['properties']['group']['enum'],
+                         enum + [group.pk])
+        self.assertEqual(options['fields']['group']['optionLabels'][-1],
+                         'new group')
+
+    def test_to_field_name_and_label_from_instance(self):
+        class NameChoiceField(forms.ModelChoiceField):
+            def label_from_instance(self, obj):
+                return obj.name.title()
+
+        class NameForm(forms.Form):
+            group = NameChoiceField(queryset=Group.objects.order_by('name'),
+                                    to_field_name='name', empty_label=None)
+
+        enum, labels = self.convert(NameForm())
+        self.assertEqual(enum, ['group 00', 'group 01', 'group 02'])
+        self.assertEqual(labels, ['Group 00', 'Group 01', 'Group 02'])
+
+    def test_label_field_without_source(self):
+        class LabelForm(forms.Form):
+            group = forms.ModelChoiceField(queryset=Group.objects.all(),
+                                           to_field_name='name')
+
+        set_choice_label(LabelForm, 'group', Upper('name'))
+        with mock.patch.object(Group, '__str__') as group_str:
+            enum, labels = self.convert(LabelForm())
+        self.assertFalse(group_str.called)
+        self.assertEqual(enum[1:], ['group 00', 'group 01', 'group 02'])
+        self.assertEqual(labels[1:], ['GROUP 00', 'GROUP 01', 'GROUP 02'])
+
+    def test_source_label_field(self):
+        source = choice_sources.register_field(GroupForm, 'group',
+                                               label_field=Upper('name'))
+        self.addCleanup(choice_sources.unregister, source.key)
+        with self.settings(JSCHEMER_CHOICES_INLINE_LIMIT=10):
+            enum, labels = self.convert(GroupForm())
+        self.assertEqual(len(enum), 4)
+        self.assertEqual(labels[1:], ['GROUP 00', 'GROUP 01', 'GROUP 02'])
+
+
+@override_settings(ROOT_URLCONF='django_jschemer.urls')
+class ChoiceSourceTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Group.objects.bulk_create(
+            [Group(name='group %02d' % i) for i in range(12)])
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.source = choice_sources.register_field(
+            GroupForm, 'group', key='groups', label_field='name',
+            search_fields=['name'], public=True)
+        self.addCleanup(choice_sources.unregister, 'groups')
+
+    def get_page(self, **params):
+        response = choices_view(self.factory.get('/choices/', params),
+                                'groups')
+        if response.status_code != 200:
+            return response, None
+        return response, json.loads(response.content.decode('utf-8'))
+
+    def test_inline_below_limit(self):
+        with self.settings(JSCHEMER_CHOICES_INLINE_LIMIT=20):
+            schema, options = DjangoFormToJSONSchema().convert_to_schema(
+                GroupForm())
+        self.assertEqual(len(schema['properties']['group']['enum']), 13)
+        self.assertNotIn('dataSource', options['fields']['group'])
+
+    def test_remote_above_limit(self):
+        with self.settings(JSCHEMER_CHOICES_INLINE_LIMIT=10):
+            with self.assertNumQueries(1):
+                schema, options = DjangoFormToJSONSchema().convert_to_schema(
+                    GroupForm())
+        self.assertNotIn('enum', schema['properties']['group'])
+        self.assertEqual(options['fields']['group']['dataSource'],
+                         '/choices/groups/')
+
+    def test_unregistered_field_is_inlined(self):
+        # sources of the model or of other fields do not apply
+        class OtherForm(forms.Form):
+            group = forms.ModelChoiceField(queryset=Group.objects.all())
+
+        choice_sources.register(Group, public=True)
+        self.addCleanup(choice_sources.unregister, 'auth.group')
+        with self.settings(JSCHEMER_CHOICES_INLINE_LIMIT=1):
+            schema, options = DjangoFormToJSONSchema().convert_to_schema(
+                OtherForm())
+        self.assertIn('enum', schema['properties']['group'])
+        self.assertIs(choice_sources.get_for_model(Group),
+                      choice_sources.get('auth.group'))
+
+    def test_field_queryset(self):
+        class FilteredForm(forms.Form):
+            group = forms.ModelChoiceField(
+                queryset=Group.objects.filter(name__endswith='1'),
+                to_field_name='name')
+
+        source = choice_sources.register_field(FilteredForm, 'group',
+                                               public=True)
+        self.addCleanup(choice_sources.unregister, source.key)
+        self.assertEqual(source.key,
+                         'django_jschemer.tests.test_choices.FilteredForm.group')
+        response = choices_view(self.factory.get('/'), source.key)
+        page = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([item['value'] for item in page],
+                         ['group 01', 'group 11'])
+
+    def test_permission(self):
+        self.source.public = False
+        response, _ = self.get_page()
+        self.assertEqual(response.status_code, 403)
+        self.source.permission = lambda request: request.GET.get('token') == 'ok'
+        self.assertEqual(self.get_page()[0].status_code, 403)
+        self.assertEqual(self.get_page(token='ok')[0].status_code, 200)
+
+    def test_view_pagination(self):
+        with self.settings(JSCHEMER_CHOICES_PAGE_SIZE=5):
+            response, page = self.get_page()
+            self.assertEqual([item['text'] for item in page],
+                             ['group %02d' % i for i in range(5)])
+            self.assertIn('after=%d' % page[-1]['value'], response['Link'])
+
+            response, last = self.get_page(after=page[-1]['value'], limit=100)
+            self.assertEqual(len(last), 5)
+            self.assertEqual(last[0]['value'], page[-1]['value'] + 1)
+
+    def test_view_search(self):
+        response, page = self.get_page(q='GROUP 1', limit=10)
+        self.assertEqual([item['text'] for item in page],
+                         ['group 10', 'group 11'])
+        self.assertFalse(response.has_header('Link'))
+
+    def test_view_errors(self):
+        self.assertEqual(self.get_page(limit='x')[0].status_code, 400)
+        self.assertEqual(self.get_page(limit=0)[0].status_code, 400)
+        self.assertEqual(self.get_page(after='x')[0].status_code, 400)
+        with self.assertRaises(Http404):
+            choices_view(self.factory.get('/'), 'auth.user')
@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+from unittest import mock
+
+from django import forms
+from django.apps import apps
+from django.core.management import call_command
+from django.test.utils import override_settings
+
+from django_jschemer.apps import JSchemerConfig
+from django_jschemer.decorators import export_schema
+from django_jschemer import export
+from django_jschemer.export import form_registry, get_form_schema
+from django_jschemer.jsonschema import DjangoFormToJSONSchema
+
+
+@export_schema(form_key='contact')
+class ContactForm(forms.Form):
+    name = forms.CharField(max_length=30)
+    email = forms.EmailField(help_text='We will not spam you')
+
+
+class ExportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+
+    def _export(self, *args):
+        call_command('jschemer_export', *args, output=self.output_dir,
+                     languages=['en', 'de'], stdout=StringIO())
+        with open(os.path.join(self.output_dir, 'manifest.json')) as manifest:
+            return json.load(manifest)
+
+    def test_export(self):
+        manifest = self._export('contact')
+        self.assertEqual(list(manifest['forms']), ['contact'])
+        entry = manifest['forms']['contact']['en']
+        self.assertTrue(entry['schema'].startswith('contact.en.schema.'))
+        self.assertTrue(entry['schema'].endswith(entry['schema_hash'] + '.json'))
+
+        with open(os.path.join(self.output_dir, entry['schema'])) as exported:
+            content = exported.read()
+        self.assertFalse(' ' in content.replace('We will not spam you', ''))
+        self.assertEqual(entry['schema_size'], len(content.encode('utf-8')))
+        schema, options = DjangoFormToJSONSchema(
+            form_key='contact').convert_to_schema(ContactForm)
+        self.assertEqual(json.loads(content), json.loads(json.dumps(schema)))
+
+        # same content, same file name
+        self.assertEqual(self._export('contact')['forms'], manifest['forms'])
+
+    def test_settings_forms(self):
+        with override_settings(JSCHEMER_EXPORT_FORMS={
+                'survey': 'django_jschemer.tests.test_jsonschemafield.SurveyForm'}):
+            manifest = self._export()
+        self.assertTrue('survey' in manifest['forms'])
+        self.assertTrue('contact' in manifest['forms'])
+
+    def test_settings_forms_are_built_once(self):
+        declared = {
+            'survey': 'django_jschemer.tests.test_jsonschemafield.SurveyForm'}
+        with override_settings(JSCHEMER_EXPORT_FORMS=declared), \
+                mock.patch('django_jschemer.export.import_string',
+                           wraps=export.import_string) as import_string:
+            survey = form_registry.get('survey')
+            self.assertIsNotNone(survey)
+            self.assertIs(form_registry.get('survey'), survey)
+            self.assertIsNone(form_registry.get('missing'))
+            self.assertEqual(import_string.call_count, 1)
+        # rebuilt when the setting changes
+        self.assertIsNone(form_registry.get('survey'))
+
+    def test_get_form_schema(self):
+        manifest = self._export('contact')
+        manifest_path = os.path.join(self.output_dir, 'manifest.json')
+        # Mark the exported schema to see where it comes from
+        filename = manifest['forms']['contact']['de']['schema']
+        with open(os.path.join(self.output_dir, filename), 'w') as exported:
+            exported.write('{"exported": true}')
+        with override_settings(JSCHEMER_MANIFEST=manifest_path):
+            schema, options = get_form_schema('contact', language='de')
+            self.assertEqual(schema, {'exported': True})
+            # not exported for this language, converted at runtime instead
+            schema, options = get_form_schema('contact', language='fr')
+            self.assertEqual(schema['id'], 'contact')
+            with self.assertRaises(KeyError):
+                get_form_schema('does-not-exist')
+
+    def test_autodiscover(self):
+        app_config = apps.get_app_config('django_jschemer')
+        self.assertIsInstance(app_config, JSchemerConfig)
+        with mock.patch('django_jschemer.apps.autodiscover_modules') as autodiscover:
+            app_config.ready()
+        autodiscover.assert_called_once_with('forms')
+
+    def test_register(self):
+        with self.assertRaises(ValueError):
+            form_registry.register(forms.Form, form_key='contact')
+        for form_key in ('../contact', 'a/b', '.contact', 'a..b', ''):
+            with self.assertRaisesRegex(ValueError, "Invalid form key"):
+                form_registry.register(forms.Form, form_key=form_key)
+        export_schema()(forms.Form)
+        self.assertTrue(
+            'django.forms.forms.Form' in form_registry.get_forms())
+        form_registry.unregister('django.forms.forms.Form')
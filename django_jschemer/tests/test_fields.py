@@ -2,9 +2,12 @@ import jsonschema
 import unittest
 from django.forms import Form
 from django.forms import fields
+from django.forms.widgets import HiddenInput
 from django.utils.translation import ugettext_lazy as _
 
 from django_jschemer import fields as jsonfields
+from django_jschemer.jsonschema import DjangoFormToJSONSchema
+from django_jschemer.registry import field_registry
 
 
 class TestForm(Form):
@@ -235,3 +238,88 @@ class FormFieldsTestCase(unittest.TestCase):
         choice_labels = [choice[1] for choice in unbound_field.choices]
         self.assertEquals(part['enum'], enum)
         self.assertEquals(alpaca_options['optionLabels'], choice_labels)
+
+    def test_number_fields(self):
+        class NumberForm(Form):
+            a_float = fields.FloatField(min_value=0.5)
+            a_decimal = fields.DecimalField(max_value=10)
+
+        schema, _ = DjangoFormToJSONSchema().convert_to_schema(NumberForm)
+        self.assertEqual(schema['properties']['a_float']['type'], 'number')
+        self.assertEqual(schema['properties']['a_float']['minimum'], 0.5)
+        self.assertEqual(schema['properties']['a_decimal']['type'], 'number')
+        jsonschema.validate({'a_float': 1.5, 'a_decimal': 2.25}, schema)
+
+    def test_multiplechoicefield(self):
+        class MultipleForm(Form):
+            choices = fields.MultipleChoiceField(choices=TestForm.CHOICES)
+            typed = fields.TypedMultipleChoiceField(choices=TestForm.CHOICES)
+
+        schema, options = DjangoFormToJSONSchema().convert_to_schema(
+            MultipleForm)
+        for name in ('choices', 'typed'):
+            part = schema['properties'][name]
+            self.assertEqual(part['type'], 'array')
+            self.assertEqual(part['items'], {'type': 'string',
+                                             'enum': ['a', 'b', 'c']})
+            self.assertTrue(options['fields'][name]['multiple'])
+            self.assertEqual(options['fields'][name]['optionLabels'],
+                             ['OPTION A', 'OPTION B', 'OPTION C'])
+        jsonschema.validate({'choices': ['a', 'c'], 'typed': []}, schema)
+        with self.assertRaises(jsonschema.ValidationError):
+            jsonschema.validate({'choices': 'a', 'typed': []}, schema)
+        with self.assertRaises(jsonschema.ValidationError):
+            jsonschema.validate({'choices': ['d'], 'typed': []}, schema)
+
+
+class ReusedSchemaFieldTestCase(unittest.TestCase):
+
+    def test_builtin_fields_are_slotted(self):
+        for schemafield_cls in set(field_registry._registry.values()):
+            self.assertFalse(hasattr(schemafield_cls(), '__dict__'),
+                             schemafield_cls)
+
+    def test_instances_are_reused(self):
+        converter = DjangoFormToJSONSchema()
+        first = converter.convert_formfield(TestForm.base_fields['a_charfield'],
+                                            'a_charfield')
+        schemafield = converter._schemafields[jsonfields.CharField]
+        second = converter.convert_formfield(fields.CharField(), 'other')
+        self.assertIs(converter._schemafields[jsonfields.CharField],
+                      schemafield)
+        self.assertIsNot(first[1], second[1])
+        self.assertEqual(first[0]['maxLength'], 20)
+        self.assertNotIn('maxLength', second[0])
+        self.assertEqual(second[0]['title'], 'Other')
+
+    def test_subclass_assigning_attributes(self):
+        class HiddenCharField(jsonfields.CharField):
+            __slots__ = ()
+
+            def __init__(self, field=None, name=None):
+                super(HiddenCharField, self).__init__(field, name)
+                self.widget = HiddenInput()
+                self.help_text = 'Overridden'
+
+        converter = DjangoFormToJSONSchema()
+        field = TestForm.base_fields['a_charfield']
+        first = converter.get_schemafield(HiddenCharField, field, 'first')
+        self.assertIsInstance(first.widget, HiddenInput)
+        self.assertEqual(first.get_schema_part()['description'], 'Overridden')
+        self.assertEqual(first.initial, field.initial)
+        second = converter.get_schemafield(HiddenCharField, field, 'second')
+        self.assertIsNot(first, second)
+        self.assertIsInstance(second.widget, HiddenInput)
+
+    def test_unslotted_subclass(self):
+        class StatefulField(jsonfields.CharField):
+            def bind(self, field, name):
+                self.converted = name
+                return super(StatefulField, self).bind(field, name)
+
+        converter = DjangoFormToJSONSchema()
+        field = TestForm.base_fields['a_charfield']
+        first = converter.get_schemafield(StatefulField, field, 'first')
+        second = converter.get_schemafield(StatefulField, field, 'second')
+        self.assertIsNot(first, second)
+        self.assertEqual(first.converted, 'first')
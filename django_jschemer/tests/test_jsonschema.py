@@ -1,6 +1,22 @@
+import json
 import unittest
+from django.contrib.auth.models import Group, Permission, User
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.forms import Form, fields, formset_factory
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+from django.utils import translation
 from .test_fields import TestForm, TestFormWithNoOptions
-from django_jschemer.jsonschema import DjangoFormToJSONSchema
+from django.utils.translation import ugettext_lazy as _
+from django_jschemer import i18n, signals
+from django_jschemer.choices import choice_sources
+from django_jschemer.forms import SchemaValidator
+from django_jschemer.jsonschema import (DjangoFormToJSONSchema,
+                                        DjangoModelToJSONSchema, Nested,
+                                        apply_merge_plan, get_merge_plans,
+                                        get_schema_cache, merge_plan,
+                                        size_report)
 import jsonschema
 from jsonschema.exceptions import ValidationError as SchemaValidationError
 
@@ -73,3 +89,516 @@ class DjangoFormToJSONSchemaTestCase(unittest.TestCase):
 
     def test_convert_formfield(self):
         pass
+
+
+class SchemaCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        DjangoFormToJSONSchema.invalidate_cache()
+
+    def tearDown(self):
+        DjangoFormToJSONSchema.invalidate_cache()
+
+    def test_cache_hit(self):
+        schema, options = DjangoFormToJSONSchema(
+            use_cache=True).convert_to_schema(TestForm)
+        # Unchanged instances share the class level conversion
+        cached_schema, cached_options = DjangoFormToJSONSchema(
+            use_cache=True).convert_to_schema(TestForm())
+        self.assertIs(cached_schema, schema)
+        self.assertIs(cached_options, options)
+        self.assertEqual(schema['dependencies'], {'a_url': ['a_charfield']})
+        # form_key is part of the key
+        keyed_schema, _ = DjangoFormToJSONSchema(
+            form_key='other', use_cache=True).convert_to_schema(TestForm)
+        self.assertIsNot(keyed_schema, schema)
+        self.assertEqual(keyed_schema['id'], 'other')
+        self.assertNotIn('id', schema)
+
+    def test_changed_instance_fields(self):
+        schema, _ = DjangoFormToJSONSchema(
+            use_cache=True).convert_to_schema(TestForm)
+        form = TestForm()
+        form.fields['a_charfield'].max_length = 5
+        form.fields['extra'] = fields.CharField()
+        changed_schema, _ = DjangoFormToJSONSchema(
+            use_cache=True).convert_to_schema(form)
+        self.assertEqual(changed_schema['properties']['a_charfield']['maxLength'], 5)
+        self.assertIn('extra', changed_schema['properties'])
+        self.assertEqual(schema['properties']['a_charfield']['maxLength'], 20)
+
+    def test_language_and_invalidation(self):
+        with translation.override('en'):
+            english, _ = DjangoFormToJSONSchema(
+                use_cache=True).convert_to_schema(TestForm)
+        with translation.override('de'):
+            german, _ = DjangoFormToJSONSchema(
+                use_cache=True).convert_to_schema(TestForm)
+        self.assertIsNot(english, german)
+        # one language neutral conversion, resolved per language
+        self.assertEqual(len(get_schema_cache()), 3)
+        DjangoFormToJSONSchema.invalidate_cache(TestFormWithNoOptions)
+        self.assertEqual(len(get_schema_cache()), 3)
+        DjangoFormToJSONSchema.invalidate_cache(TestForm())
+        self.assertEqual(len(get_schema_cache()), 0)
+
+    def test_lazy_strings_resolved_per_language(self):
+        class DayForm(Form):
+            day = fields.CharField(label=_('Monday'), help_text=_('Monday'))
+
+        converted = []
+
+        def receiver(sender, **kwargs):
+            converted.append(kwargs['name'])
+        signals.field_converted.connect(receiver, weak=False)
+        self.addCleanup(signals.field_converted.disconnect, receiver)
+        converter = DjangoFormToJSONSchema(use_cache=True)
+        for language, expected in (('en', 'Monday'), ('de', 'Montag')):
+            with translation.override(language):
+                schema, _options = converter.convert_to_schema(DayForm)
+            self.assertEqual(schema['properties']['day']['title'], expected)
+            self.assertIs(type(schema['properties']['day']['description']),
+                          str)
+        self.assertEqual(converted, ['day'])
+
+        with translation.override('de'):
+            uncached, _options = DjangoFormToJSONSchema().convert_to_schema(
+                DayForm)
+        self.assertEqual(uncached['properties']['day']['title'], 'Montag')
+
+    def test_cleared_on_translation_settings(self):
+        DjangoFormToJSONSchema(use_cache=True).convert_to_schema(TestForm)
+        with override_settings(JSCHEMER_MAX_DEPTH=5):
+            self.assertEqual(len(get_schema_cache()), 2)
+        with override_settings(LANGUAGES=[('en', 'English')]):
+            self.assertEqual(len(get_schema_cache()), 0)
+        i18n.translation_file_changed(file_path='locale/de/django.po')
+        DjangoFormToJSONSchema(use_cache=True).convert_to_schema(TestForm)
+        i18n.translation_file_changed(file_path='locale/de/django.mo')
+        self.assertEqual(len(get_schema_cache()), 0)
+
+
+class MergePlanTestCase(unittest.TestCase):
+
+    def test_merge(self):
+        overrides = {
+            'fields': {'a': {'placeholder': 'A', 'extra': {}}, 'b': None},
+            'helper': ['x'],
+            'form': {'attributes': {'method': 'post'}},
+        }
+        plan = merge_plan(overrides)
+        self.assertEqual(len(plan), 5)
+        target = {
+            'fields': {'a': {'type': 'select', 'extra': 'no dict'},
+                       'b': {'type': 'text'}},
+            'helper': '',
+            'form': 'not a dict',
+        }
+        apply_merge_plan(target, plan)
+        self.assertEqual(target, {
+            'fields': {'a': {'type': 'select', 'placeholder': 'A',
+                             'extra': {}},
+                       'b': None},
+            'helper': ['x'],
+            'form': {'attributes': {'method': 'post'}},
+        })
+        # merged dicts are not shared with the overrides
+        self.assertIsNot(target['form'], overrides['form'])
+
+    def test_plans_are_computed_once(self):
+        meta_options = TestForm.SchemerOptions
+        self.assertIs(get_merge_plans(meta_options),
+                      get_merge_plans(meta_options))
+        DjangoFormToJSONSchema.invalidate_cache(TestForm)
+        plans = get_merge_plans(meta_options)
+        schema, options = DjangoFormToJSONSchema().convert_to_schema(TestForm)
+        self.assertIs(get_merge_plans(meta_options), plans)
+        self.assertEqual(schema['dependencies'], {'a_url': ['a_charfield']})
+
+
+class CompactTestCase(unittest.TestCase):
+
+    class CompactForm(Form):
+        name = fields.CharField(max_length=10)
+        size = fields.ChoiceField(choices=[('s', 's'), ('m', 'm')],
+                                  required=False)
+        color = fields.ChoiceField(choices=[('r', 'Red')], required=False,
+                                   help_text='Pick one')
+
+    def test_compact(self):
+        full, full_options = DjangoFormToJSONSchema().convert_to_schema(
+            self.CompactForm)
+        schema, options = DjangoFormToJSONSchema(
+            compact=True).convert_to_schema(self.CompactForm)
+        self.assertEqual(full['properties']['name']['description'], '')
+        self.assertEqual(schema['properties']['name'],
+                         {'title': 'Name', 'type': 'string', 'maxLength': 10})
+        self.assertNotIn('description', schema['properties']['size'])
+        self.assertEqual(schema['properties']['color']['description'],
+                         'Pick one')
+        self.assertNotIn('name', options['fields'])
+        self.assertEqual(options['helper'], '')
+        self.assertEqual(options['fields']['size']['optionLabels'], ['s', 'm'])
+
+        schema, options = DjangoFormToJSONSchema(
+            compact=True, drop_alpaca_defaults=True).convert_to_schema(
+                self.CompactForm)
+        self.assertNotIn('helper', options)
+        self.assertEqual(options['fields']['size'], {'type': 'select'})
+        self.assertEqual(options['fields']['color'],
+                         {'type': 'select', 'optionLabels': ['Red']})
+
+    def test_setting_and_cache_key(self):
+        with override_settings(JSCHEMER_COMPACT=True):
+            converter = DjangoFormToJSONSchema(use_cache=True)
+        self.assertTrue(converter.compact)
+        self.assertNotEqual(converter.get_cache_key(self.CompactForm),
+                            DjangoFormToJSONSchema(
+                                use_cache=True).get_cache_key(self.CompactForm))
+
+    def test_size_report(self):
+        report = size_report(self.CompactForm)
+        self.assertEqual([row[0] for row in report],
+                         ['default', 'compact', 'compact+alpaca'])
+        schema_sizes = [row[1] for row in report]
+        options_sizes = [row[2] for row in report]
+        self.assertTrue(schema_sizes[0] > schema_sizes[1] == schema_sizes[2])
+        self.assertTrue(options_sizes[0] > options_sizes[1] > options_sizes[2])
+
+
+class RowForm(Form):
+    name = fields.CharField(max_length=10)
+    quantity = fields.IntegerField(required=False)
+
+
+class FormsetTestCase(unittest.TestCase):
+
+    def setUp(self):
+        DjangoFormToJSONSchema.invalidate_cache()
+        self.addCleanup(DjangoFormToJSONSchema.invalidate_cache)
+
+    def test_convert_formset(self):
+        formset_cls = formset_factory(RowForm, min_num=1, validate_min=True,
+                                      max_num=3, validate_max=True)
+        converter = DjangoFormToJSONSchema(form_key='rows', use_cache=True)
+        schema, options = converter.convert_formset(formset_cls)
+        row_schema, row_options = DjangoFormToJSONSchema(
+            use_cache=True).convert_to_schema(RowForm)
+        self.assertIs(schema['items'], row_schema)
+        self.assertIs(options['items'], row_options)
+        self.assertEqual(schema['id'], 'rows')
+        self.assertEqual((schema['minItems'], schema['maxItems']), (1, 3))
+        self.assertEqual(options['type'], 'array')
+
+        # an instance converts the same, and all rows validate in one pass
+        schema, options = converter.convert_formset(formset_cls())
+        validator = SchemaValidator(schema, collect_errors=True)
+        validator(json.dumps([{'name': 'a'}, {'name': 'b', 'quantity': 2}]))
+        with self.assertRaises(ValidationError) as context:
+            validator(json.dumps([{'name': 'a'}, {}, {'name': 'way too long'}]))
+        self.assertEqual(sorted(error.params['path']
+                                for error in context.exception.error_list),
+                         ['1', '2.name'])
+        for rows in ([], [{'name': 'a'}] * 4):
+            with self.assertRaises(ValidationError):
+                validator(json.dumps(rows))
+
+    def test_absolute_max_and_extra_fields(self):
+        formset_cls = formset_factory(RowForm, min_num=2, can_delete=True,
+                                      can_order=True)
+        with translation.override('de'):
+            schema, options = DjangoFormToJSONSchema().convert_formset(
+                formset_cls)
+        self.assertNotIn('minItems', schema)
+        self.assertEqual(schema['maxItems'], formset_cls.absolute_max)
+        self.assertEqual(list(schema['items']['properties']),
+                         ['name', 'quantity', 'ORDER', 'DELETE'])
+        self.assertEqual(schema['items']['properties']['DELETE']['title'],
+                         'Löschen')
+        self.assertIn('DELETE', options['items']['fields'])
+        self.assertNotIn('DELETE', DjangoFormToJSONSchema().convert_to_schema(
+            RowForm)[0]['properties'])
+
+
+class AddressForm(Form):
+    street = fields.CharField(max_length=50)
+    city = fields.CharField(max_length=20)
+
+
+class ContactForm(Form):
+    email = fields.EmailField()
+    address = fields.CharField(required=False)
+
+    class SchemerOptions:
+        nested = {'home': AddressForm}
+
+
+class OrderForm(Form):
+    reference = fields.CharField()
+
+    class SchemerOptions:
+        nested = {
+            'billing': AddressForm,
+            'shipping': AddressForm,
+            'contacts': formset_factory(ContactForm, max_num=2,
+                                        validate_max=True),
+        }
+
+
+class NestedFormTestCase(unittest.TestCase):
+
+    def setUp(self):
+        DjangoFormToJSONSchema.invalidate_cache()
+        self.addCleanup(DjangoFormToJSONSchema.invalidate_cache)
+
+    def test_nested(self):
+        converted = []
+
+        def receiver(name, **kwargs):
+            converted.append(name)
+        signals.field_converted.connect(receiver, weak=False)
+        self.addCleanup(signals.field_converted.disconnect, receiver)
+
+        schema, options = DjangoFormToJSONSchema().convert_to_schema(OrderForm)
+        jsonschema.Draft4Validator.check_schema(schema)
+        # each sub-form is converted once, however often it is used
+        self.assertEqual(sorted(converted), ['address', 'city', 'email',
+                                             'reference', 'street'])
+        self.assertEqual(list(schema['definitions']),
+                         ['AddressForm', 'ContactForm'])
+        self.assertEqual(schema['properties']['billing']['$ref'],
+                         '#/definitions/AddressForm')
+        self.assertEqual(schema['properties']['shipping']['$ref'],
+                         '#/definitions/AddressForm')
+        contacts = schema['properties']['contacts']
+        self.assertEqual(contacts['items'], {'$ref': '#/definitions/ContactForm'})
+        self.assertEqual(contacts['maxItems'], 2)
+        # forms nested in sub-forms are defined in the root schema
+        self.assertEqual(schema['definitions']['ContactForm']['properties']
+                         ['home']['$ref'], '#/definitions/AddressForm')
+        self.assertNotIn('definitions', schema['definitions']['ContactForm'])
+        self.assertEqual(schema['required'],
+                         ['reference', 'billing', 'shipping', 'contacts'])
+        self.assertIn('street', options['fields']['billing']['fields'])
+        self.assertIn('home', options['fields']['contacts']['items']['fields'])
+
+        address = {'street': 'Main St', 'city': 'Athens'}
+        document = {'reference': 'A1', 'billing': address,
+                    'shipping': address,
+                    'contacts': [{'email': 'a@example.com', 'home': address}]}
+        validator = SchemaValidator(schema, collect_errors=True)
+        validator(json.dumps(document))
+        document['shipping'] = {'street': 'Main St'}
+        document['contacts'][0]['home'] = {'city': 'x' * 21, 'street': ''}
+        with self.assertRaises(ValidationError) as context:
+            validator(json.dumps(document))
+        self.assertEqual(sorted(error.params['path']
+                                for error in context.exception.error_list),
+                         ['contacts.0.home.city', 'shipping'])
+
+    def test_nested_options(self):
+
+        class GiftForm(Form):
+            reference = fields.CharField()
+
+            class SchemerOptions:
+                nested = {
+                    'billing': AddressForm,
+                    'gift_address': Nested(AddressForm, required=False,
+                                           label='Deliver to'),
+                    'contacts': Nested(formset_factory(
+                        ContactForm, can_order=True, can_delete=True)),
+                    'people': formset_factory(ContactForm),
+                }
+
+        schema, options = DjangoFormToJSONSchema().convert_to_schema(GiftForm)
+        jsonschema.Draft4Validator.check_schema(schema)
+        properties = schema['properties']
+        self.assertEqual(schema['required'],
+                         ['reference', 'billing', 'contacts', 'people'])
+        self.assertEqual(properties['gift_address']['title'], 'Deliver to')
+        self.assertEqual(properties['billing']['title'], 'Billing')
+
+        # rows of formsets that can order or delete get their own definition
+        self.assertEqual(list(schema['definitions']),
+                         ['AddressForm', 'ContactForm', 'ContactForm_2'])
+        self.assertEqual(properties['contacts']['items']['$ref'],
+                         '#/definitions/ContactForm')
+        rows = schema['definitions']['ContactForm']
+        self.assertEqual(list(rows['properties'])[-2:], ['ORDER', 'DELETE'])
+        self.assertEqual(rows['required'], ['email', 'home'])
+        self.assertIn('DELETE', options['fields']['contacts']['items']['fields'])
+        self.assertEqual(properties['people']['items']['$ref'],
+                         '#/definitions/ContactForm_2')
+        self.assertNotIn('ORDER', schema['definitions']['ContactForm_2']
+                         ['properties'])
+
+        address = {'street': 'Main St', 'city': 'Athens'}
+        document = {'reference': 'A1', 'billing': address, 'people': [],
+                    'contacts': [{'email': 'a@example.com', 'home': address,
+                                  'ORDER': 1, 'DELETE': True}]}
+        jsonschema.validate(document, schema)
+        document['contacts'][0]['ORDER'] = 'first'
+        with self.assertRaises(SchemaValidationError):
+            jsonschema.validate(document, schema)
+
+    def test_nested_compact(self):
+        schema, options = DjangoFormToJSONSchema(
+            compact=True).convert_to_schema(OrderForm)
+        jsonschema.Draft4Validator.check_schema(schema)
+        self.assertNotIn('description',
+                         schema['definitions']['AddressForm']['properties']
+                         ['street'])
+        self.assertEqual(options['fields']['billing'], {'helper': ''})
+        self.assertEqual(options['fields']['contacts'],
+                         {'type': 'array', 'items': {
+                             'fields': {'home': {'helper': ''}},
+                             'helper': ''}})
+
+        schema, options = DjangoFormToJSONSchema(
+            compact=True, drop_alpaca_defaults=True).convert_to_schema(
+                OrderForm)
+        self.assertNotIn('billing', options.get('fields', {}))
+        self.assertEqual(options['fields']['contacts'], {'type': 'array'})
+
+    def test_nested_definitions(self):
+        schema, _ = DjangoFormToJSONSchema(
+            use_definitions=True).convert_to_schema(OrderForm)
+        jsonschema.Draft4Validator.check_schema(schema)
+        self.assertEqual(schema['properties']['billing']['$ref'],
+                         '#/definitions/AddressForm')
+
+
+class DefinitionsTestCase(unittest.TestCase):
+
+    class RepeatedForm(Form):
+        COLORS = [('color_%d' % i, 'Color %d' % i) for i in range(20)]
+        SIZES = [('s', 'Small'), ('l', 'Large')]
+        color_1 = fields.ChoiceField(choices=COLORS)
+        color_2 = fields.ChoiceField(choices=COLORS, label='Second color')
+        color_3 = fields.ChoiceField(choices=COLORS, required=False)
+        code_1 = fields.CharField(max_length=8, min_length=8)
+        code_2 = fields.CharField(max_length=8, min_length=8, help_text='Help')
+        name = fields.CharField(max_length=20)
+        size_1 = fields.ChoiceField(choices=SIZES)
+        size_2 = fields.ChoiceField(choices=SIZES)
+
+    def test_definitions(self):
+        plain, _ = DjangoFormToJSONSchema().convert_to_schema(self.RepeatedForm)
+        schema, _ = DjangoFormToJSONSchema(
+            use_definitions=True).convert_to_schema(self.RepeatedForm)
+        jsonschema.Draft4Validator.check_schema(schema)
+        self.assertTrue(len(json.dumps(schema)) < len(json.dumps(plain)))
+
+        properties = schema['properties']
+        self.assertEqual(list(schema['definitions']), ['color_1'])
+        self.assertEqual(schema['definitions']['color_1'],
+                         {'type': 'string',
+                          'enum': [choice[0] for choice in self.RepeatedForm.COLORS]})
+        self.assertEqual(properties['color_2'],
+                         {'$ref': '#/definitions/color_1',
+                          'title': 'Second color', 'description': ''})
+        self.assertEqual(properties['color_3']['$ref'], '#/definitions/color_1')
+        # not shared with another field
+        self.assertEqual(properties['name'], plain['properties']['name'])
+        # shared but too small to be worth a $ref
+        self.assertEqual(properties['code_2'], plain['properties']['code_2'])
+        self.assertEqual(properties['size_2'], plain['properties']['size_2'])
+
+        data = {'color_1': 'color_1', 'color_2': 'color_2', 'code_1': '12345678',
+                'code_2': '12345678', 'name': 'John', 'size_1': 's',
+                'size_2': 'l'}
+        jsonschema.validate(data, schema)
+        with self.assertRaisesRegex(SchemaValidationError, "is not one of"):
+            jsonschema.validate(dict(data, color_2='yellow'), schema)
+        with self.assertRaisesRegex(SchemaValidationError, "is too short"):
+            jsonschema.validate(dict(data, code_2='1'), schema)
+
+
+class UnknownField(models.Field):
+    # not in model_field_types, like JSONField
+    pass
+
+
+class Document(models.Model):
+    data = UnknownField()
+    note = models.CharField(max_length=10, null=True, blank=True)
+    size = models.CharField(max_length=1, null=True, blank=True,
+                            choices=[('s', 'Small'), ('l', 'Large')])
+    parent = models.ForeignKey('self', null=True, blank=True,
+                               on_delete=models.CASCADE)
+
+    class Meta:
+        app_label = 'django_jschemer'
+
+
+class DjangoModelToJSONSchemaTestCase(SimpleTestCase):
+    # SimpleTestCase fails on database queries
+
+    def setUp(self):
+        DjangoModelToJSONSchema.invalidate_cache()
+        self.converter = DjangoModelToJSONSchema()
+
+    def test_convert_model(self):
+        schema, options = self.converter.convert_model(User)
+        properties = schema['properties']
+        self.assertNotIn('id', properties)
+        self.assertEqual(properties['username']['maxLength'], 150)
+        self.assertEqual(properties['email']['format'], 'email')
+        self.assertEqual(properties['is_active']['default'], True)
+        self.assertNotIn('default', properties['date_joined'])
+        self.assertEqual(properties['groups']['type'], 'array')
+        self.assertEqual(properties['groups']['items'], {'type': 'integer'})
+        self.assertIn('username', schema['required'])
+        self.assertNotIn('email', schema['required'])
+        self.assertEqual(options['fields']['groups'], {})
+
+        user = {'username': 'john', 'password': 'x', 'is_superuser': False,
+                'is_staff': False, 'is_active': True,
+                'date_joined': '2017-01-02', 'groups': [1, 2]}
+        jsonschema.validate(user, schema)
+        with self.assertRaises(SchemaValidationError):
+            jsonschema.validate(dict(user, groups=[1, 1]), schema)
+
+    def test_foreign_key(self):
+        schema, options = self.converter.convert_model(
+            Permission, exclude=['codename'])
+        self.assertEqual(list(schema['properties']), ['name', 'content_type'])
+        self.assertEqual(schema['properties']['content_type']['type'],
+                         'integer')
+
+        choice_sources.register(Group)
+        self.addCleanup(choice_sources.unregister, 'auth.group')
+        with self.settings(ROOT_URLCONF='django_jschemer.urls'):
+            schema, options = DjangoModelToJSONSchema().convert_model(
+                User, fields=['groups'])
+        self.assertEqual(list(schema['properties']), ['groups'])
+        self.assertEqual(options['fields']['groups'],
+                         {'type': 'select', 'dataSource': '/choices/auth.group/'})
+
+    def test_unknown_and_nullable_fields(self):
+        schema, options = self.converter.convert_model(Document)
+        jsonschema.Draft4Validator.check_schema(schema)
+        properties = schema['properties']
+        self.assertNotIn('type', properties['data'])
+        self.assertEqual(properties['note']['type'], ['string', 'null'])
+        self.assertEqual(properties['note']['maxLength'], 10)
+        self.assertEqual(properties['size']['enum'], ['s', 'l', None])
+        self.assertEqual(options['fields']['size']['optionLabels'],
+                         ['Small', 'Large', ''])
+        self.assertEqual(properties['parent']['type'], ['integer', 'null'])
+        jsonschema.validate({'data': [1, {'a': None}], 'note': None,
+                             'size': None, 'parent': None}, schema)
+        jsonschema.validate({'data': 'x', 'note': 'text', 'size': 's',
+                             'parent': 1}, schema)
+        with self.assertRaises(SchemaValidationError):
+            jsonschema.validate({'data': 1, 'size': 'm'}, schema)
+
+    def test_cache(self):
+        first = self.converter.convert_model(Group)
+        self.assertIs(DjangoModelToJSONSchema().convert_model(Group()), first)
+        with translation.override('de'):
+            german = self.converter.convert_model(Group)
+        self.assertIsNot(german, first)
+        DjangoModelToJSONSchema.invalidate_cache(Group)
+        self.assertIsNot(self.converter.convert_model(Group), first)
@@ -1,7 +1,10 @@
 import json
 
 import unittest
+from unittest import mock
 from django import forms
+from django.utils import translation
+from django.utils.translation import ugettext_lazy as _
 
 from django_jschemer.jsonschema import DjangoFormToJSONSchema
 from django_jschemer.forms import JSONSchemaField
@@ -28,6 +31,37 @@ class JSONSchemaFieldTestCase(unittest.TestCase):
         html = field.as_widget()
         self.assertTrue('data-schemajson' in html)
 
+    def test_data_attributes_cached(self):
+        with mock.patch.object(JSONSchemaField, 'encode_data_attributes',
+                               autospec=True,
+                               side_effect=JSONSchemaField.encode_data_attributes) as encode:
+            # encoded once when the field was created
+            for i in range(3):
+                self.targetform()['survey_entry'].as_widget()
+            self.assertEqual(encode.call_count, 0)
+            # fields built from the same schema share the encoding
+            JSONSchemaField(schema=self.schema).get_data_attributes()
+            self.assertEqual(encode.call_count, 0)
+
+            # a new schema invalidates the encoded attributes
+            field = self.targetform.base_fields['survey_entry']
+            field.schema = dict(self.schema, title='changed')
+            html = self.targetform()['survey_entry'].as_widget()
+            self.assertEqual(encode.call_count, 1)
+            self.assertTrue('changed' in html)
+
+    def test_data_attributes_language(self):
+        class LocalizedForm(forms.Form):
+            entry = JSONSchemaField(schema={'type': 'string',
+                                            'title': _('Monday')})
+
+        with translation.override('en'):
+            english = LocalizedForm()['entry'].as_widget()
+        with translation.override('de'):
+            german = LocalizedForm()['entry'].as_widget()
+        self.assertTrue('Monday' in english)
+        self.assertTrue('Montag' in german)
+
     def test_field_validation(self):
         survey_response = {
             'name': 'John Smith',
@@ -0,0 +1,97 @@
+import datetime
+import json
+import unittest
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test.utils import override_settings
+from django.utils import translation
+from django.utils.translation import ugettext_lazy as _
+
+from django_jschemer import jsonutil
+from django_jschemer.jsonutil import dumps, get_backend, resolve_promises
+
+
+class DumpsTestCase(unittest.TestCase):
+
+    value = OrderedDict([
+        ('title', _('Monday')),
+        ('enum', ('a', _('Monday'))),
+        ('nested', {_('Monday'): [1, 2.5, None, True]}),
+        ('date', datetime.date(2017, 1, 2)),
+        ('decimal', Decimal('1.5')),
+        ('text', 'α</script>'),
+    ])
+
+    def test_resolve_promises(self):
+        with translation.override('de'):
+            resolved = resolve_promises(self.value)
+        self.assertEqual(resolved['title'], 'Montag')
+        self.assertIs(type(resolved['title']), str)
+        self.assertEqual(resolved['enum'], ['a', 'Montag'])
+        self.assertEqual(resolved['nested'], {'Montag': [1, 2.5, None, True]})
+        # key order is kept, e.g. for the field order of 'properties'
+        self.assertIsInstance(resolved, OrderedDict)
+        self.assertEqual(list(resolved), list(self.value))
+        properties = OrderedDict((name, {}) for name in 'zyxabc')
+        self.assertEqual(list(resolve_promises({'p': properties})['p']),
+                         list('zyxabc'))
+
+    def test_backends(self):
+        expected = {
+            'title': 'Montag', 'enum': ['a', 'Montag'],
+            'nested': {'Montag': [1, 2.5, None, True]},
+            'date': '2017-01-02', 'decimal': '1.5', 'text': 'α</script>',
+        }
+        for name, (encode, available) in jsonutil.BACKENDS.items():
+            if not available:
+                continue
+            with override_settings(JSCHEMER_JSON_BACKEND=name), \
+                    translation.override('de'):
+                self.assertEqual(get_backend(), name)
+                encoded = dumps(self.value, sort_keys=True)
+            self.assertEqual(json.loads(encoded), expected, name)
+            self.assertEqual(encoded, json.dumps(
+                expected, sort_keys=True, separators=(',', ':'),
+                ensure_ascii=False), name)
+
+    def test_backends_match_json(self):
+        tz = datetime.timezone(datetime.timedelta(hours=2))
+        values = [
+            datetime.datetime(2017, 1, 2, 3, 4, 5, 678912),
+            datetime.datetime(2017, 1, 2, 3, 4, 5, tzinfo=tz),
+            datetime.datetime(2017, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc),
+            datetime.time(3, 4, 5, 678912),
+            datetime.timedelta(days=1, seconds=2),
+            Decimal('1.10'),
+            2 ** 64 + 1,
+            -2 ** 70,
+            float('nan'),
+            float('inf'),
+            {'nested': [float('-inf'), None]},
+            {1: 'int key', 2.5: 'float key'},
+        ]
+        for value in values:
+            value = {'value': value, 'null': None}
+            with override_settings(JSCHEMER_JSON_BACKEND='json'):
+                expected = dumps(value, sort_keys=True)
+            for name, (encode, available) in jsonutil.BACKENDS.items():
+                if not available:
+                    continue
+                with override_settings(JSCHEMER_JSON_BACKEND=name):
+                    self.assertEqual(dumps(value, sort_keys=True), expected,
+                                     (name, value))
+
+    def test_configuration(self):
+        with override_settings(JSCHEMER_JSON_BACKEND=None):
+            self.assertIn(get_backend(), jsonutil.BACKEND_PREFERENCE)
+        with override_settings(JSCHEMER_JSON_BACKEND='simplejson'):
+            with self.assertRaises(ImproperlyConfigured):
+                dumps({})
+        missing = [name for name, (encode, available)
+                   in jsonutil.BACKENDS.items() if not available]
+        for name in missing:
+            with override_settings(JSCHEMER_JSON_BACKEND=name):
+                with self.assertRaises(ImproperlyConfigured):
+                    dumps({})
@@ -61,6 +61,9 @@ class RegistryTestCase(unittest.TestCase):
                           jsonfields.CharField)
 
         registry.unregister(fields.CharField)
+        # restore it for the tests that follow
+        self.addCleanup(registry.register, fields.CharField,
+                        jsonfields.CharField)
         self.assertEquals( registry.get_schemafield(fields.CharField), None)
 
         with self.assertRaises(ValueError):
@@ -90,4 +93,26 @@ class RegistryTestCase(unittest.TestCase):
         # it to not be registered
         registry.unregister(UnsupportedField)
 
+    def test_getschemafield_subclass(self):
+        class MyCharField(fields.CharField):
+            pass
+
+        self.assertEqual(registry.get_schemafield(MyCharField()),
+                         registry.get_schemafield(fields.CharField))
+        # A class sharing the name of a registered field is not a match
+        CharField = type('CharField', (fields.Field,), {})
+        with self.assertRaises(KeyError):
+            registry.get_schemafield(CharField())
+
+    def test_resolution_cache_invalidation(self):
+        class MyURLField(fields.URLField):
+            pass
 
+        self.assertEqual(registry.get_schemafield(MyURLField),
+                         jsonfields.URLField)
+        registry.register(MyURLField, TestSchemaField1)
+        self.assertEqual(registry.get_schemafield(MyURLField),
+                         TestSchemaField1)
+        registry.unregister(MyURLField)
+        self.assertEqual(registry.get_schemafield(MyURLField),
+                         jsonfields.URLField)
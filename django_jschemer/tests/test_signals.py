@@ -0,0 +1,64 @@
+import unittest
+
+from django.core.exceptions import ValidationError
+
+from django_jschemer import signals
+from django_jschemer.forms import JSONSchemaField, SchemaValidator
+from django_jschemer.jsonschema import DjangoFormToJSONSchema
+from .test_fields import TestForm
+
+
+class SignalsTestCase(unittest.TestCase):
+
+    def _receive(self, signal):
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs)
+        signal.connect(receiver, weak=False)
+        self.addCleanup(signal.disconnect, receiver)
+        return received
+
+    def test_conversion_signals(self):
+        converted = self._receive(signals.schema_converted)
+        fields = self._receive(signals.field_converted)
+        DjangoFormToJSONSchema().convert_to_schema(TestForm)
+
+        self.assertEqual(len(converted), 1)
+        self.assertEqual(converted[0]['form'], TestForm)
+        self.assertEqual(converted[0]['field_count'], len(TestForm.base_fields))
+        self.assertIsNone(converted[0]['cache_hit'])
+        self.assertTrue(converted[0]['duration'] >= 0)
+        self.assertEqual([kwargs['name'] for kwargs in fields],
+                         list(TestForm.base_fields))
+
+    def test_cache_signals(self):
+        DjangoFormToJSONSchema.invalidate_cache()
+        self.addCleanup(DjangoFormToJSONSchema.invalidate_cache)
+        converted = self._receive(signals.schema_converted)
+        accessed = self._receive(signals.cache_accessed)
+        for i in range(2):
+            DjangoFormToJSONSchema(use_cache=True).convert_to_schema(TestForm)
+        self.assertEqual([kwargs['cache_hit'] for kwargs in converted],
+                         [False, True])
+        # resolved and language neutral entries miss, then resolved hits
+        self.assertEqual([kwargs['hit'] for kwargs in accessed
+                          if kwargs['cache'] == 'schemas'], [False, False, True])
+
+    def test_validation_signal(self):
+        finished = self._receive(signals.validation_finished)
+        validator = SchemaValidator({'type': 'object',
+                                     'required': ['a', 'b']})
+        validator('{"a": 1, "b": 2}')
+        with self.assertRaises(ValidationError):
+            validator('{}')
+        self.assertEqual([(kwargs['valid'], kwargs['error_count'],
+                           kwargs['payload_size']) for kwargs in finished],
+                         [(True, 0, 16), (False, 1, 2)])
+
+    def test_encoding_signal(self):
+        encoded = self._receive(signals.json_encoded)
+        field = JSONSchemaField(schema={'type': 'string',
+                                        'title': 'encoding signal'})
+        attrs = field.encode_data_attributes()
+        self.assertEqual(encoded[-1]['size'], len(attrs['data-schemajson']))
@@ -0,0 +1,321 @@
+import itertools
+import json
+import time
+import unittest
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+
+from django_jschemer.cache import ExpiringLRUCache, LRUCache, lazy_cache
+from django_jschemer.forms import SchemaValidator
+from django_jschemer.jsonutil import schema_fingerprint
+from django_jschemer import validation
+from django_jschemer.validation import (get_result_cache, get_validator,
+                                        get_validator_cache, load_json)
+
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'name': {'type': 'string', 'maxLength': 10},
+        'email': {'type': 'string', 'format': 'email'},
+    },
+    'required': ['name'],
+}
+
+
+class LRUCacheTestCase(unittest.TestCase):
+
+    def test_lazy_cache(self):
+        built = []
+
+        @lazy_cache
+        def get_cache():
+            """Docstring"""
+            built.append(True)
+            return LRUCache()
+
+        self.assertEqual(built, [])
+        self.assertIs(get_cache(), get_cache())
+        self.assertEqual(built, [True])
+        self.assertEqual(get_cache.__doc__, 'Docstring')
+
+    def test_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        # touch 'a' so that 'b' becomes the least recently used
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+
+class ExpiringLRUCacheTestCase(unittest.TestCase):
+
+    @mock.patch('django_jschemer.cache.time.monotonic')
+    def test_ttl(self, monotonic):
+        monotonic.return_value = 100
+        cache = ExpiringLRUCache(ttl=10)
+        cache.set('a', 1)
+        monotonic.return_value = 109
+        self.assertEqual(cache.get('a'), 1)
+        monotonic.return_value = 110
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+    def test_maxbytes(self):
+        cache = ExpiringLRUCache(maxbytes=10, sizeof=len)
+        cache.set('a', 'xxxx')
+        cache.set('b', 'xxxx')
+        self.assertEqual(cache.size, 8)
+        cache.set('c', 'xxxx')
+        self.assertEqual(cache.keys(), ['b', 'c'])
+        cache.set('b', 'x')
+        self.assertEqual(cache.size, 5)
+        # values larger than the whole cache are not stored
+        cache.set('d', 'x' * 11)
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(cache.pop('c'), 'xxxx')
+        self.assertEqual(cache.size, 1)
+
+
+class MemoizedResultsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        get_result_cache().clear()
+        self.addCleanup(get_result_cache().clear)
+
+    def test_memoize(self):
+        validator = SchemaValidator(SCHEMA, memoize=True, collect_errors=True)
+        invalid = '{"name": "A name that is too long", "email": 1}'
+        with mock.patch.object(validator, 'get_validator',
+                               wraps=validator.get_validator) as compiled:
+            for i in range(2):
+                self.assertEqual(validator('{"name": "John"}'),
+                                 '{"name": "John"}')
+                with self.assertRaises(ValidationError) as context:
+                    validator(invalid)
+                errors = context.exception.error_list
+                self.assertEqual(sorted(error.params['path'] for error in errors),
+                                 ['email', 'name'])
+                with self.assertRaises(ValidationError):
+                    validator('not json')
+            self.assertEqual(compiled.call_count, 2)
+
+        # other options are memoized separately
+        with self.assertRaises(ValidationError) as context:
+            SchemaValidator(SCHEMA, memoize=True)(invalid)
+        self.assertEqual(len(context.exception.error_list), 1)
+
+    def test_parsing_modes_are_memoized_separately(self):
+        messages = []
+        for streaming in (False, True):
+            validator = SchemaValidator(SCHEMA, memoize=True,
+                                        streaming=streaming)
+            with self.assertRaises(ValidationError) as context:
+                validator('{"name": NaN}')
+            messages.append(context.exception.messages)
+        self.assertNotEqual(messages[0], messages[1])
+        self.assertEqual(len(get_result_cache()), 2)
+
+    def test_disabled_by_default(self):
+        SchemaValidator(SCHEMA)('{"name": "John"}')
+        self.assertEqual(len(get_result_cache()), 0)
+
+
+class CompiledValidatorTestCase(unittest.TestCase):
+
+    def test_fingerprint_ignores_key_order(self):
+        reordered = OrderedDict([
+            ('required', ['name']),
+            ('properties', SCHEMA['properties']),
+            ('type', 'object'),
+        ])
+        self.assertEqual(schema_fingerprint(SCHEMA),
+                         schema_fingerprint(reordered))
+        changed = dict(SCHEMA, required=[])
+        self.assertNotEqual(schema_fingerprint(SCHEMA),
+                            schema_fingerprint(changed))
+
+    def test_validator_is_reused(self):
+        validator = get_validator(SCHEMA)
+        self.assertIs(get_validator(dict(SCHEMA)), validator)
+        self.assertIn(schema_fingerprint(SCHEMA), get_validator_cache())
+
+    def test_schemavalidator_shares_compiled_validator(self):
+        first = SchemaValidator(SCHEMA)
+        second = SchemaValidator(dict(SCHEMA))
+        self.assertIs(first.get_validator(), second.get_validator())
+
+        self.assertEqual(first('{"name": "John"}'), '{"name": "John"}')
+        with self.assertRaisesRegex(ValidationError, "too long"):
+            first('{"name": "A name that is too long"}')
+        # format checking is still enabled
+        with self.assertRaisesRegex(ValidationError, "email"):
+            second('{"name": "John", "email": "not an email"}')
+        with self.assertRaises(ValidationError):
+            first('not json')
+
+
+class BoundedLoadTestCase(unittest.TestCase):
+
+    nested = '{"a": [[[{"b": "[[[[not nested]]]]"}]]]}'
+
+    def test_max_size(self):
+        self.assertEqual(load_json('[1, 2]', max_size=6), [1, 2])
+        with self.assertRaisesRegex(ValueError, "exceeds the maximum size"):
+            load_json('[1, 2, 3]', max_size=6)
+        # size is counted in UTF-8 bytes
+        with self.assertRaisesRegex(ValueError, "exceeds the maximum size"):
+            load_json('"\u03b1\u03b2"', max_size=5)
+
+    def _test_depth(self, streaming):
+        self.assertEqual(load_json(self.nested, max_depth=5,
+                                   streaming=streaming),
+                         json.loads(self.nested))
+        with self.assertRaisesRegex(ValueError, "nested deeper than 4"):
+            load_json(self.nested, max_depth=4, streaming=streaming)
+        with self.assertRaises(ValueError):
+            load_json('{"a": [1, 2}', streaming=streaming)
+        self.assertEqual(load_json(self.nested, max_containers=5,
+                                   streaming=streaming),
+                         json.loads(self.nested))
+        with self.assertRaisesRegex(ValueError, "more than 4 arrays"):
+            load_json(self.nested, max_containers=4, streaming=streaming)
+        for constant in ('NaN', 'Infinity', '-Infinity'):
+            with self.assertRaisesRegex(ValueError, "not valid JSON|error"):
+                load_json('{"a": %s}' % constant, streaming=streaming)
+        self.assertEqual(load_json(b'{"a": "\xce\xb1", "b": 1.5}',
+                                   max_depth=2, streaming=streaming),
+                         {'a': '\u03b1', 'b': 1.5})
+
+    def test_depth(self):
+        self._test_depth(streaming=False)
+
+    def test_depth_unterminated_string(self):
+        # used to take quadratic time, scanning from each escaped quote
+        document = '["' + '\\"' * 100000
+        start = time.perf_counter()
+        with self.assertRaises(ValueError):
+            load_json(document, max_depth=5, max_containers=5)
+        self.assertLess(time.perf_counter() - start, 1)
+        with self.assertRaisesRegex(ValueError, "nested deeper than 1"):
+            validation.check_depth('["a\\"[", [1]]', max_depth=1)
+        validation.check_depth('["a\\"[[[', max_depth=1)
+
+    @unittest.skipIf(validation.ijson is None, "ijson is not installed")
+    def test_depth_streaming(self):
+        self._test_depth(streaming=True)
+        self.assertEqual(load_json('{"a": 1.5}', streaming=True), {'a': 1.5})
+        # str documents are read in chunks
+        document = json.dumps({'a': ['\u03b1' * 100000, True]})
+        self.assertEqual(load_json(document, max_depth=2, streaming=True),
+                         json.loads(document))
+
+    def test_schemavalidator_limits(self):
+        validator = SchemaValidator(SCHEMA, max_payload_size=40, max_depth=2)
+        validator('{"name": "John"}')
+        with self.assertRaisesRegex(ValidationError, "maximum size"):
+            validator('{"name": "John", "email": "john@example.com"}')
+        with self.assertRaisesRegex(ValidationError, "nested deeper"):
+            validator('{"name": "John", "x": [[1]]}')
+
+
+class BatchValidationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.validator = SchemaValidator(SCHEMA)
+        self.documents = [
+            '{"name": "John"}',
+            '{"name": "A name that is too long"}',
+            'not json',
+            '{"name": "Jane", "email": "jane@example.com"}',
+        ] * 3
+
+    def _check(self, results):
+        results = list(results)
+        self.assertEqual([result.index for result in results],
+                         list(range(len(self.documents))))
+        self.assertEqual([result.value for result in results], self.documents)
+        self.assertEqual([result.is_valid for result in results],
+                         [True, False, False, True] * 3)
+        self.assertTrue('too long' in results[1].errors[0])
+
+    def test_serial(self):
+        self._check(self.validator.validate_many(iter(self.documents),
+                                                 chunksize=5))
+
+    def test_thread_pool(self):
+        self._check(self.validator.validate_many(self.documents,
+                                                 executor='thread', workers=2,
+                                                 chunksize=2))
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            self._check(self.validator.validate_many(self.documents,
+                                                     executor=executor,
+                                                     chunksize=3))
+
+    def test_process_pool(self):
+        self._check(self.validator.validate_many(self.documents,
+                                                 executor='process',
+                                                 workers=2, chunksize=4))
+
+    @mock.patch('django_jschemer.batch._HAS_POOL_INITIALIZER', False)
+    def test_process_pool_without_initializer(self):
+        self._check(self.validator.validate_many(self.documents,
+                                                 executor='process',
+                                                 workers=2, chunksize=4))
+
+    def test_streaming_input(self):
+        documents = ('{"name": "%d"}' % i for i in itertools.count())
+        results = self.validator.validate_many(documents, executor='thread',
+                                               workers=2, chunksize=10)
+        first = list(itertools.islice(results, 25))
+        results.close()
+        self.assertEqual(first[-1].value, '{"name": "24"}')
+        self.assertTrue(all(result.is_valid for result in first))
+
+
+class CollectErrorsTestCase(unittest.TestCase):
+
+    schema = {
+        'type': 'object',
+        'properties': {
+            'name': {'type': 'string'},
+            'tags': {'type': 'array', 'items': {'type': 'string'}},
+        },
+    }
+    document = '{"name": 1, "tags": ["a", 2, 3, 4]}'
+
+    def test_first_error_only(self):
+        with self.assertRaises(ValidationError) as context:
+            SchemaValidator(self.schema)(self.document)
+        self.assertEqual(len(context.exception.error_list), 1)
+
+    def test_collect_errors(self):
+        validator = SchemaValidator(self.schema, collect_errors=True)
+        with self.assertRaises(ValidationError) as context:
+            validator(self.document)
+        errors = context.exception.error_list
+        self.assertEqual(sorted(error.params['path'] for error in errors),
+                         ['name', 'tags.1', 'tags.2', 'tags.3'])
+        self.assertTrue(all(error.code == 'schema' for error in errors))
+        self.assertTrue("tags.1: 2 is not of type 'string'" in
+                        context.exception.messages)
+
+    def test_limits(self):
+        validator = SchemaValidator(self.schema, collect_errors=True,
+                                    max_errors=2)
+        with self.assertRaises(ValidationError) as context:
+            validator(self.document)
+        self.assertEqual(len(context.exception.error_list), 2)
+
+        validator = SchemaValidator(self.schema, collect_errors=True,
+                                    error_time_budget=0)
+        with self.assertRaises(ValidationError) as context:
+            validator(self.document)
+        self.assertEqual(len(context.exception.error_list), 1)
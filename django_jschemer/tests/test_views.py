@@ -0,0 +1,147 @@
+import gzip
+import json
+from unittest import mock
+
+from django import forms
+from django.contrib.auth.models import Group
+from django.http import Http404
+from django.test import SimpleTestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from django.utils import translation
+
+from django_jschemer import export
+from django_jschemer.forms import JSONSchemaField
+from django_jschemer.views import (get_payload_cache, get_schema_payload,
+                                   get_schema_url, schema_view)
+from .test_export import ContactForm  # noqa: registers the 'contact' form
+
+
+@override_settings(ROOT_URLCONF='django_jschemer.urls')
+class SchemaViewTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_schema_view(self):
+        response = schema_view(self.factory.get('/', {'lang': 'en'}), 'contact')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(data['schema']['id'], 'contact')
+        self.assertTrue('fields' in data['options'])
+
+        etag = response['ETag']
+        request = self.factory.get('/', {'lang': 'en'},
+                                   HTTP_IF_NONE_MATCH='"other", W/' + etag)
+        not_modified = schema_view(request, 'contact')
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], etag)
+
+        with self.assertRaises(Http404):
+            schema_view(self.factory.get('/'), 'does-not-exist')
+
+    def test_gzip(self):
+        plain = schema_view(self.factory.get('/'), 'contact')
+        response = schema_view(
+            self.factory.get('/', HTTP_ACCEPT_ENCODING='deflate, gzip'),
+            'contact')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertNotEqual(response['ETag'], plain['ETag'])
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        # each representation only matches its own ETag
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip',
+                                   HTTP_IF_NONE_MATCH=plain['ETag'])
+        self.assertEqual(schema_view(request, 'contact').status_code, 200)
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING='gzip',
+                                   HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(schema_view(request, 'contact').status_code, 304)
+
+    def test_unsupported_language(self):
+        cache_size = len(get_payload_cache())
+        for language in ('xx-random', 'yy', 'de<script>'):
+            with self.assertRaises(Http404):
+                schema_view(self.factory.get('/', {'lang': language}), 'contact')
+        self.assertEqual(len(get_payload_cache()), cache_size)
+        # variants of supported languages fall back to them
+        response = schema_view(self.factory.get('/', {'lang': 'de-xx'}),
+                               'contact')
+        self.assertEqual(response.status_code, 200)
+
+    def test_versioned_url(self):
+        url = get_schema_url('contact', language='en')
+        self.assertTrue(url.startswith('/schemas/contact.json?lang=en&v='))
+        version = url.rsplit('=', 1)[1]
+        response = schema_view(self.factory.get('/', {'lang': 'en', 'v': version}),
+                               'contact')
+        self.assertTrue('immutable' in response['Cache-Control'])
+
+    def test_queryset_form_payload_ttl(self):
+        class GroupForm(forms.Form):
+            group = forms.ModelChoiceField(queryset=Group.objects.all())
+
+        export.form_registry.register(GroupForm, 'group')
+        self.addCleanup(export.form_registry.unregister, 'group')
+        self.addCleanup(get_payload_cache().clear)
+
+        def convert(form_key, language):
+            # a new conversion on every call, like forms with querysets
+            return {'type': 'object', 'id': form_key}, {}
+
+        with mock.patch('django_jschemer.views.get_form_schema',
+                        side_effect=convert) as get_form_schema, \
+                mock.patch('django_jschemer.views.time.monotonic',
+                           return_value=1000.0) as monotonic:
+            payload = get_schema_payload('group', 'en')
+            self.assertIs(get_schema_payload('group', 'en'), payload)
+            self.assertEqual(get_form_schema.call_count, 1)
+            monotonic.return_value = 1061.0
+            self.assertIsNot(get_schema_payload('group', 'en'), payload)
+            self.assertEqual(get_form_schema.call_count, 2)
+            # forms with cached conversions are checked on every call
+            get_schema_payload('contact', 'en')
+            get_schema_payload('contact', 'en')
+            self.assertEqual(get_form_schema.call_count, 4)
+
+    def test_widget_url_mode(self):
+        class PageForm(forms.Form):
+            inlined = JSONSchemaField.for_form('contact')
+            referenced = JSONSchemaField.for_form('contact', inline=False)
+
+        form = PageForm()
+        self.assertTrue('data-schemajson' in form['inlined'].as_widget())
+        html = form['referenced'].as_widget()
+        self.assertFalse('data-schemajson' in html)
+        self.assertTrue('data-schemaurl="/schemas/contact.json?lang=' in html)
+        # validation still uses the schema
+        self.assertTrue(PageForm(data={
+            'inlined': '{"name": "John", "email": "john@example.com"}',
+            'referenced': '{"name": "John", "email": "john@example.com"}',
+        }).is_valid())
+
+    def test_for_form_is_lazy(self):
+        with mock.patch('django_jschemer.forms.get_form_schema') as get_form_schema:
+            field = JSONSchemaField.for_form('contact')
+        self.assertFalse(get_form_schema.called)
+
+        class PageForm(forms.Form):
+            contact = field
+
+        languages = []
+
+        def record_language(form_key):
+            languages.append(translation.get_language())
+            return export.get_form_schema(form_key)
+        with mock.patch('django_jschemer.forms.get_form_schema',
+                        side_effect=record_language):
+            with translation.override('de'):
+                html = PageForm()['contact'].as_widget()
+        self.assertEqual(set(languages), {'de'})
+        self.assertTrue('data-fieldkey="contact"' in html)
+        self.assertTrue('data-schemajson="{' in html)
+        self.assertTrue(PageForm(data={
+            'contact': '{"name": "John", "email": "john@example.com"}',
+        }).is_valid())
+        self.assertFalse(PageForm(data={'contact': '{"name": 1}'}).is_valid())
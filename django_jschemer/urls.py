@@ -0,0 +1,11 @@
+from django.conf.urls import url
+
+from django_jschemer import views
+
+# Include in your URLconf, e.g. url(r'^jschemer/', include('django_jschemer.urls'))
+urlpatterns = [
+    url(r'^schemas/(?P<form_key>[\w.-]+)\.json$', views.schema_view,
+        name='jschemer-schema'),
+    url(r'^choices/(?P<key>[\w.-]+)/$', views.choices_view,
+        name='jschemer-choices'),
+]
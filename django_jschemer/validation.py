@@ -0,0 +1,235 @@
+import hashlib
+import json
+import re
+import time
+
+from jsonschema import FormatChecker
+from jsonschema.validators import validator_for
+
+from django_jschemer.cache import ExpiringLRUCache, LRUCache, lazy_cache
+from django_jschemer.conf import get_setting
+from django_jschemer.jsonutil import schema_fingerprint
+
+try:
+    import ijson
+except ImportError:  # Streaming parser is optional
+    ijson = None
+
+
+@lazy_cache
+def get_validator_cache():
+    """
+    Return the process wide cache of compiled validators, keyed by schema
+    fingerprint.
+    """
+    return LRUCache(maxsize=get_setting('JSCHEMER_VALIDATOR_CACHE_SIZE'),
+                    name='validators')
+
+
+def _result_size(errors):
+    # key (fingerprint, options and digest) plus the stored error tuples
+    return 200 + sum(len(str(message)) + len(str(params))
+                     for message, code, params in errors)
+
+
+@lazy_cache
+def get_result_cache():
+    """
+    Return the process wide cache of validation outcomes used by
+    SchemaValidator(memoize=True). Entries are bounded in count, total size
+    and age by the JSCHEMER_RESULT_CACHE_* settings.
+    """
+    return ExpiringLRUCache(
+        maxsize=get_setting('JSCHEMER_RESULT_CACHE_SIZE'),
+        maxbytes=get_setting('JSCHEMER_RESULT_CACHE_MAX_BYTES'),
+        ttl=get_setting('JSCHEMER_RESULT_CACHE_TTL'),
+        sizeof=_result_size, name='results')
+
+
+def payload_digest(value):
+    """
+    Return the sha256 digest of a JSON document (str or bytes).
+    """
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return hashlib.sha256(value).digest()
+
+
+def compile_validator(schema):
+    """
+    Check the schema against its metaschema and return a validator instance
+    (with a format checker) ready to validate documents.
+    """
+    validator_cls = validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema, format_checker=FormatChecker())
+
+
+def get_validator(schema, fingerprint=None):
+    """
+    Return a compiled validator for schema, reusing a cached one if the same
+    schema was compiled before.
+
+    fingerprint -- precomputed schema_fingerprint(schema), if available.
+    """
+    if fingerprint is None:
+        fingerprint = schema_fingerprint(schema)
+    cache = get_validator_cache()
+    validator = cache.get(fingerprint)
+    if validator is None:
+        validator = compile_validator(schema)
+        cache.set(fingerprint, validator)
+    return validator
+
+
+def collect_errors(validator, instance, max_errors=None, time_budget=None):
+    """
+    Return the errors validator finds in instance, stopping early once
+    max_errors errors were found or time_budget seconds have passed.
+    """
+    errors = []
+    deadline = None
+    if time_budget is not None:
+        deadline = time.monotonic() + time_budget
+    for error in validator.iter_errors(instance):
+        errors.append(error)
+        if max_errors is not None and len(errors) >= max_errors:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+    return errors
+
+
+def format_path(path):
+    """
+    Format the path of a jsonschema error (a deque of keys and indices) as a
+    dotted string, e.g. 'items.0.name'.
+    """
+    return '.'.join(str(part) for part in path)
+
+
+# Matches JSON strings (so brackets inside them are skipped) and brackets.
+# The closing quote is optional so that an unterminated string is consumed
+# in one match instead of being rescanned from each of its escaped quotes.
+_STRUCTURE_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"?|[\[\]{}]')
+
+
+def check_payload_size(value, max_size):
+    """
+    Raise ValueError if value is larger than max_size bytes (UTF-8).
+    """
+    if isinstance(value, bytes):
+        size = len(value)
+    elif len(value) > max_size:
+        size = len(value)
+    elif len(value) * 4 <= max_size:
+        # can not exceed max_size whatever the encoding
+        return
+    else:
+        size = len(value.encode('utf-8'))
+    if size > max_size:
+        raise ValueError("Payload of {} bytes exceeds the maximum size of {} "
+                         "bytes".format(size, max_size))
+
+
+def _too_deep(max_depth):
+    return ValueError("Document is nested deeper than {} levels".format(
+        max_depth))
+
+
+def _too_many_containers(max_containers):
+    return ValueError("Document has more than {} arrays and objects".format(
+        max_containers))
+
+
+def check_depth(value, max_depth=None, max_containers=None):
+    """
+    Scan the raw JSON text and raise ValueError if arrays/objects are nested
+    deeper than max_depth or there are more than max_containers of them.
+    Nothing is decoded.
+    """
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    depth = containers = 0
+    for match in _STRUCTURE_RE.finditer(value):
+        token = match.group()
+        if token == '{' or token == '[':
+            depth += 1
+            containers += 1
+            if max_depth is not None and depth > max_depth:
+                raise _too_deep(max_depth)
+            if max_containers is not None and containers > max_containers:
+                raise _too_many_containers(max_containers)
+        elif token == '}' or token == ']':
+            depth -= 1
+
+
+class _UTF8Reader(object):
+    """
+    Read a str as UTF-8 encoded chunks, without encoding it all at once.
+    """
+
+    def __init__(self, value):
+        self.value = value
+        self.position = 0
+
+    def read(self, size=-1):
+        start = self.position
+        end = len(self.value) if size < 0 else start + size
+        self.position = min(end, len(self.value))
+        return self.value[start:end].encode('utf-8')
+
+
+def check_streaming(value, max_depth=None, max_containers=None):
+    """
+    Tokenize the JSON document with ijson and raise ValueError if it is
+    invalid, nested deeper than max_depth or has more than max_containers
+    arrays and objects. Only the parser's events are kept in memory, nothing
+    is built.
+    """
+    if isinstance(value, str):
+        value = _UTF8Reader(value)
+    depth = containers = 0
+    try:
+        for event, _ in ijson.basic_parse(value):
+            if event == 'start_map' or event == 'start_array':
+                depth += 1
+                containers += 1
+                if max_depth is not None and depth > max_depth:
+                    raise _too_deep(max_depth)
+                if (max_containers is not None and
+                        containers > max_containers):
+                    raise _too_many_containers(max_containers)
+            elif event == 'end_map' or event == 'end_array':
+                depth -= 1
+    except ijson.JSONError as error:
+        raise ValueError(str(error))
+
+
+def _reject_constant(name):
+    raise ValueError("{} is not valid JSON".format(name))
+
+
+def load_json(value, max_size=None, max_depth=None, streaming=False,
+              max_containers=None):
+    """
+    Decode a JSON document, rejecting it before anything is decoded if it is
+    larger than max_size bytes, nested deeper than max_depth or has more than
+    max_containers arrays and objects.
+
+    streaming -- check the limits (and the syntax) with ijson's incremental
+    tokenizer, if installed, instead of scanning the raw text for brackets.
+    Either way the document is then decoded with json.loads(), only if it
+    passed.
+
+    NaN, Infinity and -Infinity are rejected, as they are not valid JSON.
+
+    Raises ValueError for invalid or oversized documents.
+    """
+    if max_size is not None:
+        check_payload_size(value, max_size)
+    if streaming and ijson is not None:
+        check_streaming(value, max_depth, max_containers)
+    elif max_depth is not None or max_containers is not None:
+        check_depth(value, max_depth, max_containers)
+    return json.loads(value, parse_constant=_reject_constant)
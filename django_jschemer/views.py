@@ -0,0 +1,185 @@
+import re
+import time
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.http import (Http404, HttpResponse, HttpResponseBadRequest,
+                         HttpResponseForbidden, HttpResponseNotModified)
+from django.utils.http import urlencode
+from django.utils.text import compress_string
+from django.utils.translation import (get_language,
+                                      get_supported_language_variant)
+
+try:
+    from django.urls import reverse
+except ImportError:  # Django < 1.10
+    from django.core.urlresolvers import reverse
+
+from django_jschemer.cache import LRUCache, lazy_cache
+from django_jschemer.choices import choice_sources
+from django_jschemer.conf import get_setting
+from django_jschemer.export import (content_hash, form_registry,
+                                    get_form_schema)
+from django_jschemer.jsonutil import dumps
+
+_accepts_gzip = re.compile(r'\bgzip\b')
+
+SchemaPayload = namedtuple('SchemaPayload', ['body', 'gzipped', 'etag',
+                                             'gzip_etag', 'version'])
+
+
+@lazy_cache
+def get_payload_cache():
+    """
+    Return the process wide cache of encoded schema_view payloads.
+    """
+    return LRUCache(maxsize=get_setting('JSCHEMER_PAYLOAD_CACHE_SIZE'),
+                    name='responses')
+
+
+def get_schema_payload(form_key, language):
+    """
+    Return the SchemaPayload (encoded body, its gzipped version, their ETags
+    and content hash) of an exported form in language.
+    Raises KeyError for unknown forms.
+
+    Payloads of forms that are converted on every use (see
+    ExportedForm.is_cacheable()) are reused for JSCHEMER_PAYLOAD_TTL seconds.
+    """
+    cache_key = (form_key, language)
+    cache = get_payload_cache()
+    cached = cache.get(cache_key)
+    now = time.monotonic()
+    if cached is not None and cached[3] is not None and now < cached[3]:
+        return cached[2]
+    schema, options = get_form_schema(form_key, language)
+    # get_form_schema() returns the same objects until the form is
+    # converted again, so identity tells if the payload is still current.
+    if cached is None or cached[0] is not schema or cached[1] is not options:
+        body = dumps({'schema': schema, 'options': options}).encode('utf-8')
+        version = content_hash(body.decode('utf-8'))
+        payload = SchemaPayload(body, compress_string(body),
+                                '"{}"'.format(version),
+                                '"{}-gzip"'.format(version), version)
+        expires = None
+        exported_form = form_registry.get(form_key)
+        if exported_form is not None and not exported_form.is_cacheable():
+            expires = now + get_setting('JSCHEMER_PAYLOAD_TTL')
+        cached = (schema, options, payload, expires)
+        cache.set(cache_key, cached)
+    return cached[2]
+
+
+def get_schema_url(form_key, language=None):
+    """
+    Return the URL of schema_view for form_key, including the language and a
+    content hash so the URL changes whenever the schema does.
+    """
+    if language is None:
+        language = get_language()
+    payload = get_schema_payload(form_key, language)
+    return '{}?{}'.format(
+        reverse('jschemer-schema', kwargs={'form_key': form_key}),
+        urlencode([('lang', language), ('v', payload.version)]))
+
+
+def _etag_matches(header, etag):
+    if header.strip() == '*':
+        return True
+    # If-None-Match uses the weak comparison
+    tags = (tag.strip() for tag in header.split(','))
+    return etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+
+def schema_view(request, form_key):
+    """
+    Serve the schema and Alpaca options of an exported form as
+    {"schema": ..., "options": ...}.
+
+    The language is taken from the `lang` query parameter, which must be
+    one of the LANGUAGES setting, or the active language. Responses carry a
+    strong ETag (content hash, with a '-gzip' suffix for the gzipped body)
+    and honour If-None-Match. Requests whose `v` parameter matches the
+    current content hash are cacheable forever.
+    """
+    language = request.GET.get('lang')
+    if language:
+        try:
+            language = get_supported_language_variant(language)
+        except LookupError:
+            raise Http404("Unsupported language")
+    else:
+        language = get_language()
+    try:
+        payload = get_schema_payload(form_key, language)
+    except KeyError:
+        raise Http404("Unknown form key")
+
+    if request.GET.get('v') == payload.version:
+        cache_control = 'public, max-age=31536000, immutable'
+    else:
+        cache_control = 'public, max-age={}'.format(
+            get_setting('JSCHEMER_SCHEMA_MAX_AGE'))
+
+    # The two encodings are different representations, with their own ETag
+    gzipped = bool(_accepts_gzip.search(
+        request.META.get('HTTP_ACCEPT_ENCODING', '')))
+    etag = payload.gzip_etag if gzipped else payload.etag
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and _etag_matches(if_none_match, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content_type='application/json')
+        if gzipped:
+            response.content = payload.gzipped
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response.content = payload.body
+        response['Content-Length'] = str(len(response.content))
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    response['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def choices_view(request, key):
+    """
+    Serve a page of a registered choice source as a list of
+    {"value": ..., "text": ...} objects, the format of Alpaca's dataSource.
+
+    Query parameters: `q` to search, `after` to continue after the last
+    value of the previous page, `limit` for the page size (capped by
+    JSCHEMER_CHOICES_PAGE_SIZE). If there may be more results a
+    `Link: <...>; rel="next"` header points to the next page.
+
+    Requests the source does not allow (see ChoiceSource.has_permission())
+    get a 403.
+    """
+    source = choice_sources.get(key)
+    if source is None:
+        raise Http404("Unknown choice source")
+    if not source.has_permission(request):
+        return HttpResponseForbidden()
+    search = request.GET.get('q') or None
+    after = request.GET.get('after') or None
+    try:
+        limit = int(request.GET['limit']) if 'limit' in request.GET else None
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be positive")
+        page = source.get_page(search=search, after=after, limit=limit)
+    except (ValueError, ValidationError):
+        return HttpResponseBadRequest("Invalid parameters")
+
+    response = HttpResponse(
+        dumps([{'value': value, 'text': label} for value, label in page]),
+        content_type='application/json')
+    page_size = get_setting('JSCHEMER_CHOICES_PAGE_SIZE')
+    if page and len(page) == min(limit or page_size, page_size):
+        params = [('after', page[-1][0])]
+        if search:
+            params.append(('q', search))
+        if limit:
+            params.append(('limit', limit))
+        response['Link'] = '<{}?{}>; rel="next"'.format(request.path,
+                                                        urlencode(params))
+    return response
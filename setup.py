@@ -34,12 +34,17 @@ setup(name='django-jschemer',
       maintainer_email = 'arcanum@kill9.eu',
       url='https://github.com/kmetaxas/django-jschemer',
       license='New BSD License',
-      packages=find_packages(exclude=['tests']),
+      packages=find_packages(exclude=['tests', 'benchmarks']),
       test_suite='tests.runtests.runtests',
       install_requires=[
           'jsonschema',
-          'deepmerge',
       ],
+      extras_require={
+          # incremental parsing of submitted documents
+          'streaming': ['ijson'],
+          # faster encoding of schemas and options
+          'speedups': ['orjson'],
+      },
       tests_require=(
         'pep8',
         'coverage',